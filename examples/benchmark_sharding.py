@@ -0,0 +1,81 @@
+""" BENCHMARK + CONSISTENCY CHECK: BRANCH-SHARDED CIRCULATION ON ONE HOST """
+
+import copy
+import random
+import time
+
+from src.main_function_library_ import checkout_book, return_book, search_books
+from src.sharding import ShardedLibrary
+
+BRANCHES = ["B001", "B002", "B003", "B004", "B005"]
+WORDS = ("the of and history war night garden house river shadow king queen silent secret last "
+         "first lost city stone fire winter summer road song dark light world empire ocean tale").split()
+AUTHORS = "martin rowling tolkien austen orwell marquez herbert atwood morrison dickens".split()
+
+
+def build(n=100_000, n_users=2_000, seed=0):
+    rng = random.Random(seed)
+    catalog = [
+        {
+            "id": i,
+            "title": " ".join(rng.choices(WORDS, k=rng.randint(2, 6))).title(),
+            "author": f"{rng.choice(AUTHORS).title()} {rng.choice(AUTHORS).title()}",
+            "isbn": f"{rng.randrange(10**12, 10**13)}",
+            "available": True,
+            "borrow_history": [],
+            "branch_id": rng.choice(BRANCHES),
+        }
+        for i in range(n)
+    ]
+    users = [{"id": f"C{i}", "name": f"Member {i}", "borrowed_books": []} for i in range(n_users)]
+    return catalog, users
+
+
+def check_consistency(lib, catalog, users, rng, ops=2_000):
+    """Apply the same random checkouts/returns to the shards and to one in-process catalog."""
+    for _ in range(ops):
+        uid, bid = rng.choice(users)["id"], rng.randrange(len(catalog))
+        if rng.random() < 0.6:
+            assert lib.checkout_book(uid, bid) == checkout_book(uid, bid, catalog, users)
+        else:
+            assert lib.return_book(uid, bid) == return_book(uid, bid, catalog, users)
+    on_loan = sum(s["on_loan"] for s in lib.stats())
+    assert on_loan == sum(not b["available"] for b in catalog)
+    print(f"Routed {ops} checkouts/returns: results match the single catalog ({on_loan} on loan)")
+
+    for q in ("winter king", "silent river", "tolkien"):
+        sharded = lib.search_books(q, page_size=10, page=2)
+        single = search_books(q, catalog, page_size=10, page=2)
+        assert sharded["total"] == single["total"]
+        assert [b["title"] for b in sharded["results"]] == [b["title"] for b in single["results"]]
+    print("Scatter-gather search: totals and page contents match")
+
+
+def main():
+    catalog, users = build()
+    rng = random.Random(1)
+    print(f"Catalog: {len(catalog):,} books over {len(BRANCHES)} branches")
+
+    start = time.perf_counter()
+    lib = ShardedLibrary(copy.deepcopy(catalog), users)
+    print(f"Started {len(lib.branches)} shard processes in {time.perf_counter() - start:.1f} s")
+    try:
+        check_consistency(lib, catalog, users, rng)
+
+        queries = [f"{rng.choice(['winter', 'river', 'queen', 'empire'])} {rng.choice(['tale', 'song', 'night'])}"
+                   for _ in range(5)]
+        for name, run in (("single process", lambda q: search_books(q, catalog, similarity="bitparallel")),
+                          ("sharded", lambda q: lib.search_books(q, similarity="bitparallel"))):
+            start = time.perf_counter()
+            for q in queries:
+                run(q)
+            print(f"search_books {name}: {(time.perf_counter() - start) / len(queries) * 1000:.0f} ms/query")
+    finally:
+        lib.close()
+
+
+if __name__ == "__main__":
+    main()
+
+
+""" BENCHMARK COMPLETE """
@@ -0,0 +1,73 @@
+""" BENCHMARK + EQUIVALENCE CHECK: DIFFLIB VS BIT-PARALLEL FUZZY SEARCH """
+
+import random
+import time
+
+from src.main_function_library_ import search_books, _normalize_text
+from src.similarity import difflib_ratios, bitparallel_ratios
+
+WORDS = ("the of and a in to history war night garden house river shadow king queen "
+         "silent secret last first lost city stone fire winter summer brief life story "
+         "road song children dark light world empire ocean mountain tale").split()
+AUTHORS = ("martin rowling tolkien austen orwell marquez herbert atwood morrison "
+           "dickens hemingway king christie asimov le guin").split()
+
+
+def synthetic_catalog(n=50_000, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "title": " ".join(rng.choices(WORDS, k=rng.randint(2, 7))).title(),
+            "author": f"{rng.choice(AUTHORS).title()} {rng.choice(AUTHORS).title()}",
+            "isbn": f"{rng.randrange(10**12, 10**13)}",
+        }
+        for i in range(n)
+    ]
+
+
+def typo(s, rng):
+    i = rng.randrange(len(s))
+    return s[:i] + s[i + 1:]
+
+
+def check_threshold_equivalence(catalog, queries, min_ratio=0.65):
+    """Bit-parallel ratios never fall below difflib's, so difflib matches are always kept."""
+    titles = [_normalize_text(b["title"]) for b in catalog[:5_000]]
+    for q in queries:
+        d = difflib_ratios(q, titles)
+        b = bitparallel_ratios(q, titles)
+        assert (b >= d - 1e-12).all(), f"bit-parallel under-scored a pair for {q!r}"
+        agree = ((d >= min_ratio) == (b >= min_ratio)).mean()
+        print(f"  {q!r}: threshold decisions agree on {agree:.2%} of titles, "
+              f"max ratio gap {float((b - d).max()):.3f}")
+
+        slow = {x["id"] for x in search_books(q, catalog[:5_000], limit=None, min_ratio=min_ratio,
+                                              similarity="difflib")["results"]}
+        fast = {x["id"] for x in search_books(q, catalog[:5_000], limit=None, min_ratio=min_ratio,
+                                              similarity="bitparallel")["results"]}
+        assert slow <= fast, f"difflib match missing from bit-parallel results for {q!r}"
+    print("Threshold equivalence: OK")
+
+
+def main():
+    rng = random.Random(1)
+    catalog = synthetic_catalog()
+    queries = [typo(_normalize_text(rng.choice(catalog)["title"]), rng) for _ in range(5)]
+    print(f"Catalog: {len(catalog):,} books, {len(queries)} queries")
+
+    check_threshold_equivalence(catalog, queries)
+
+    for backend in ("difflib", "bitparallel"):
+        start = time.perf_counter()
+        for q in queries:
+            search_books(q, catalog, similarity=backend)
+        per_query = (time.perf_counter() - start) / len(queries)
+        print(f"search_books similarity={backend!r}: {per_query * 1000:.0f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
+
+
+""" BENCHMARK COMPLETE """
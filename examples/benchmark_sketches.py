@@ -0,0 +1,100 @@
+""" BENCHMARK: EXACT VS SKETCH-BASED REPORT METRICS """
+
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.library_name import create_report, generate_monthly_report
+from src.sketches import HyperLogLog, CountMinSketch, SpaceSaving
+
+
+def synthetic_loans(n_rows=1_000_000, n_users=200_000, n_titles=50_000, seed=0):
+    """Zipf-ish loan firehose: a few popular titles, a long tail of the rest."""
+    rng = np.random.default_rng(seed)
+    titles = np.minimum(rng.zipf(1.3, n_rows), n_titles)
+    return pd.DataFrame({
+        "user_id": rng.integers(0, n_users, n_rows).astype(str),
+        "title": pd.Series(titles).map(lambda t: f"Title {t}"),
+    })
+
+
+def synthetic_catalog(data, n_books=50_000):
+    """Spread the loan rows over book dicts with this month's borrow_history."""
+    now = datetime.now().replace(day=1, hour=12)
+    books = {}
+    for user, title in zip(data["user_id"], data["title"]):
+        book = books.setdefault(title, {"title": title, "borrow_history": []})
+        book["borrow_history"].append({"user_id": user, "borrow_date": now, "due_date": now + timedelta(days=14),
+                                       "return_date": now})
+    return list(books.values())[:n_books]
+
+
+def fed(sketch, values):
+    sketch.update(values)
+    return sketch
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    data = synthetic_loans()
+    print(f"Rows: {len(data):,}")
+
+    # Exact on the whole frame vs approximate over CSV chunks (one chunk in memory at a time)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "loans.csv")
+        data.to_csv(path, index=False)
+        exact, t_exact = timed(lambda: create_report(pd.read_csv(path, dtype=str)))
+        approx, t_approx = timed(lambda: create_report(pd.read_csv(path, dtype=str, chunksize=100_000),
+                                                       approximate=True))
+    for key in ("unique_users", "unique_titles"):
+        err = abs(approx[key] - exact[key]) / max(exact[key], 1)
+        print(f"{key}: exact={exact[key]:,} approx={approx[key]:,} rel.err={err:.2%}")
+    print(f"create_report exact, full frame {t_exact:.2f}s | approximate, 100k-row chunks {t_approx:.2f}s "
+          f"(HLL state {HyperLogLog().registers.nbytes:,} bytes, bound ~{HyperLogLog().relative_error:.1%})")
+
+    # Partitioned + merged sketches give the same answer as one sketch over everything
+    parts = np.array_split(data["user_id"].to_numpy(), 8)
+    merged = HyperLogLog()
+    for part in parts:
+        hll = HyperLogLog()
+        hll.update(part)
+        merged.merge(HyperLogLog.from_dict(hll.to_dict()))
+    print(f"8-partition merged HLL: {round(merged.count()):,}")
+
+    counts, t_counter = timed(lambda: data["title"].value_counts())
+    cms, t_cms = timed(lambda: fed(CountMinSketch(), data["title"]))
+    top = counts.index[:5]
+    print(f"value_counts {t_counter:.2f}s | Count-Min {t_cms:.2f}s ({cms.table.nbytes:,} bytes, "
+          f"max over-count {cms.epsilon * cms.total:,.0f} w.p. {1 - cms.delta:.0%})")
+    for title in top:
+        print(f"  {title}: exact={counts[title]:,} cms={cms.estimate(title):,}")
+
+    ss, t_ss = timed(lambda: fed(SpaceSaving(100), data["title"]))
+    print(f"SpaceSaving(100) {t_ss:.2f}s top-5: {ss.most_common(5)}")
+    print(f"Exact top-5: {list(counts.head(5).items())}")
+
+    # The report functions themselves, over the same loans as borrow_history
+    catalog = synthetic_catalog(data)
+    users = [{"id": u, "name": f"Member {u}"} for u in data["user_id"].unique()]
+    exact, t_exact = timed(lambda: generate_monthly_report(catalog, users, sink=None))
+    approx, t_approx = timed(lambda: generate_monthly_report(catalog, users, approximate=True, sink=None))
+    print(f"generate_monthly_report exact {t_exact:.2f}s | approximate {t_approx:.2f}s "
+          f"(title counters: {len(catalog):,} exact vs 100 approximate)")
+    print(f"  borrowed_this_month exact={exact['borrowed_this_month']:,} approx={approx['borrowed_this_month']:,}")
+    print(f"  top-5 match: {[t for t, _ in exact['top_borrowed']] == [t for t, _ in approx['top_borrowed']]}")
+
+
+if __name__ == "__main__":
+    main()
+
+
+""" BENCHMARK COMPLETE """
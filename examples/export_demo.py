@@ -0,0 +1,38 @@
+""" TO TEST STREAMING EXPORT """
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pyarrow.parquet as pq
+
+from src.export import export_rows, iter_loan_rows
+
+
+def main():
+    # open loans first, so return_date is all-null in the first row group
+    start = datetime(2024, 3, 1)
+    catalog = [
+        {"id": i, "isbn": f"97800000000{i:02d}", "title": f"Book {i}", "borrow_history": [{
+            "user_id": f"C{i}", "borrow_date": start, "due_date": start + timedelta(days=14),
+            "return_date": start + timedelta(days=10) if i >= 5 else None,
+        }]}
+        for i in range(12)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for ext in ("csv", "jsonl", "parquet"):
+            path = os.path.join(tmp, f"loans.{ext}")
+            kwargs = {"batch_size": 5} if ext == "parquet" else {}
+            print(f"{ext}: {export_rows(iter_loan_rows(catalog), path, **kwargs)} rows")
+
+        table = pq.read_table(os.path.join(tmp, "loans.parquet"))
+        print(f"parquet return_date type: {table.schema.field('return_date').type}, "
+              f"non-null: {table['return_date'].drop_null().length()}")
+
+
+if __name__ == "__main__":
+    main()
+
+
+""" TEST COMPLETE """
@@ -3,24 +3,24 @@ from datetime import date, timedelta
 
 class CirculationManager:
     def __init__(self):
-        self.is_available = True
+        self._available = True  # not "is_available": that name is the method below
         self.due_date = None
 
     def get_due_date(self):
         return self.due_date
 
     def is_available(self):
-        return self.is_available
+        return self._available
 
     def checkout_book(self, loan_days):
-        if self.is_available:
-            self.is_available = False
+        if self._available:
+            self._available = False
             self.due_date = date.today() + timedelta(days=loan_days)
             return True
         else:
             return False
 
     def return_book(self):
-        if not self.is_available:
-            self.is_available = True
+        if not self._available:
+            self._available = True
             self.due_date = None
\ No newline at end of file
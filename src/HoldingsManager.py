@@ -0,0 +1,229 @@
+#Holdings manager class
+import itertools
+import logging
+from collections import deque
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+
+class HoldingsManager:
+    """
+    Copy-level holdings: many copies per ISBN across branches, plus FIFO holds.
+
+    Every copy is tracked individually, while per-title and per-(title, branch)
+    counters of shelf-available copies are kept up to date on each transition,
+    so availability checks and "next in line" never scan copies or waitlists.
+    Returned copies (and newly added ones) are handed to the oldest active hold
+    automatically and wait on the hold shelf for that member.
+
+    Copy statuses: "available", "on_loan", "on_hold_shelf", "withdrawn".
+
+    Example
+    -------
+    >>> hm = HoldingsManager()
+    >>> hm.add_copy("c1", "978-0-441-17271-9", "B001")
+    >>> hm.checkout("978-0-441-17271-9", "C101")["copy_id"]
+    'c1'
+    >>> hm.place_hold("978-0-441-17271-9", "C102")
+    1
+    >>> hm.return_copy("c1")["member_id"]     # served to the hold automatically
+    'C102'
+    """
+
+    def __init__(self):
+        self.copies: Dict[Any, Dict[str, Any]] = {}
+        self._shelf: Dict[str, Dict[Any, set]] = {}   # isbn -> branch -> available copy ids
+        self._available: Dict[str, int] = {}          # isbn -> available copies, all branches
+        self._holds: Dict[str, Dict[Any, deque]] = {} # isbn -> pickup branch (None = any) -> FIFO of holds
+        self._active_holds: Dict[str, int] = {}       # isbn -> holds still waiting for a copy
+        self._ready: Dict[tuple, Dict[str, Any]] = {} # (isbn, member) -> hold with a copy set aside
+        self._member_holds: Dict[tuple, Dict[str, Any]] = {}  # (isbn, member) -> open hold (waiting or ready)
+        self._hold_index: Dict[int, Dict[str, Any]] = {}
+        self._hold_ids = itertools.count(1)
+
+    @classmethod
+    def from_catalog(cls, catalog: List[Dict[str, Any]]) -> "HoldingsManager":
+        """Treat every catalog dict (with 'id', 'isbn', optional 'branch_id') as one copy."""
+        hm = cls()
+        for book in catalog:
+            if book.get("removed"):
+                continue
+            hm.add_copy(book.get("id"), book.get("isbn"), book.get("branch_id"))
+            if not book.get("available", True):
+                hm._take(hm.copies[book.get("id")], "on_loan")
+        return hm
+
+    # ---------- Copies ----------
+    def add_copy(self, copy_id: Any, isbn: str, branch_id: Optional[str] = None) -> None:
+        """Register a new copy; it immediately serves the oldest active hold, if any."""
+        if copy_id in self.copies:
+            raise ValueError(f"Copy '{copy_id}' already exists.")
+        copy = {"copy_id": copy_id, "isbn": isbn, "branch_id": branch_id,
+                "status": "on_loan", "member_id": None, "due_date": None, "hold_id": None}
+        self.copies[copy_id] = copy
+        self._release(copy)
+
+    def withdraw_copy(self, copy_id: Any) -> bool:
+        """Remove a copy from circulation (only while it is on the shelf)."""
+        copy = self.copies.get(copy_id)
+        if copy is None or copy["status"] != "available":
+            return False
+        self._take(copy, "withdrawn")
+        return True
+
+    def _take(self, copy: Dict[str, Any], status: str) -> None:
+        """Move a shelf-available copy to ``status``, keeping counters in sync."""
+        if copy["status"] == "available":
+            self._shelf[copy["isbn"]][copy["branch_id"]].discard(copy["copy_id"])
+            self._available[copy["isbn"]] -= 1
+        copy["status"] = status
+
+    def _release(self, copy: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Put a copy back: to the next active hold if there is one, else on the shelf."""
+        copy.update(member_id=None, due_date=None, hold_id=None)
+        hold = self._pop_hold(copy["isbn"], copy["branch_id"])
+        if hold is not None:
+            copy.update(status="on_hold_shelf", member_id=hold["member_id"], hold_id=hold["hold_id"])
+            hold["copy_id"] = copy["copy_id"]
+            self._ready[(hold["isbn"], hold["member_id"])] = hold
+            return hold
+        copy["status"] = "available"
+        self._shelf.setdefault(copy["isbn"], {}).setdefault(copy["branch_id"], set()).add(copy["copy_id"])
+        self._available[copy["isbn"]] = self._available.get(copy["isbn"], 0) + 1
+        return None
+
+    # ---------- Availability ----------
+    def available_count(self, isbn: str, branch_id: Optional[str] = None) -> int:
+        """Copies of ``isbn`` on the shelf (at ``branch_id`` if given)."""
+        if branch_id is None:
+            return self._available.get(isbn, 0)
+        return len(self._shelf.get(isbn, {}).get(branch_id, ()))
+
+    def is_available(self, isbn: str, branch_id: Optional[str] = None) -> bool:
+        return self.available_count(isbn, branch_id) > 0
+
+    # ---------- Circulation ----------
+    def checkout(self, isbn: str, member_id: Any, branch_id: Optional[str] = None,
+                 loan_days: int = 14) -> Optional[Dict[str, Any]]:
+        """
+        Lend a copy of ``isbn`` to ``member_id``.
+
+        A copy waiting on the hold shelf for this member is used first; otherwise
+        any shelf copy (at ``branch_id`` if given), which also closes the member's
+        waiting hold on the title. Returns the copy dict, or None when nothing
+        can be lent.
+        """
+        copy = None
+        hold = self._ready.pop((isbn, member_id), None)
+        if hold is not None:
+            copy = self.copies[hold["copy_id"]]
+            hold["active"] = False
+            self._hold_index.pop(hold["hold_id"], None)
+            self._member_holds.pop((isbn, member_id), None)
+        else:
+            branches = self._shelf.get(isbn, {})
+            candidates = [branches.get(branch_id)] if branch_id is not None else branches.values()
+            shelf = next((s for s in candidates if s), None)
+            if not shelf:
+                return None
+            copy = self.copies[next(iter(shelf))]
+            self._take(copy, "on_loan")
+            waiting = self._member_holds.pop((isbn, member_id), None)
+            if waiting is not None:  # served from the shelf, so no copy should be set aside for it
+                waiting["active"] = False
+                self._hold_index.pop(waiting["hold_id"], None)
+                self._active_holds[isbn] -= 1
+        copy.update(status="on_loan", member_id=member_id, hold_id=None,
+                    due_date=date.today() + timedelta(days=loan_days))
+        return copy
+
+    def return_copy(self, copy_id: Any) -> Optional[Dict[str, Any]]:
+        """Check a copy back in. Returns the hold it was routed to, if any."""
+        copy = self.copies.get(copy_id)
+        if copy is None or copy["status"] != "on_loan":
+            logging.warning(f"Copy '{copy_id}' is not on loan.")
+            return None
+        return self._release(copy)
+
+    # ---------- Holds ----------
+    def place_hold(self, isbn: str, member_id: Any, branch_id: Optional[str] = None) -> int:
+        """
+        Join the FIFO waitlist for ``isbn``. Returns the hold id.
+
+        With ``branch_id`` the hold is only filled by a copy at that branch;
+        without it, by a copy anywhere. A member has at most one open hold per
+        title: placing another returns the existing hold id.
+        """
+        existing = self._member_holds.get((isbn, member_id))
+        if existing is not None:
+            logging.info(f"Member '{member_id}' already holds '{isbn}' (hold {existing['hold_id']}).")
+            return existing["hold_id"]
+        hold = {"hold_id": next(self._hold_ids), "isbn": isbn, "member_id": member_id,
+                "branch_id": branch_id, "placed": date.today(), "active": True, "copy_id": None}
+        self._holds.setdefault(isbn, {}).setdefault(branch_id, deque()).append(hold)
+        self._active_holds[isbn] = self._active_holds.get(isbn, 0) + 1
+        self._hold_index[hold["hold_id"]] = hold
+        self._member_holds[(isbn, member_id)] = hold
+        # A copy may already be free (e.g. holds placed while copies sit on the shelf)
+        branches = self._shelf.get(isbn, {})
+        candidates = [branches.get(branch_id)] if branch_id is not None else branches.values()
+        shelf = next((s for s in candidates if s), None)
+        if shelf:
+            copy = self.copies[next(iter(shelf))]
+            self._take(copy, "on_loan")
+            self._release(copy)
+        return hold["hold_id"]
+
+    def cancel_hold(self, hold_id: int) -> bool:
+        """Cancel a hold in O(1); a copy already set aside for it goes to the next hold."""
+        hold = self._hold_index.pop(hold_id, None)
+        if hold is None or not hold["active"]:
+            return False
+        hold["active"] = False
+        self._member_holds.pop((hold["isbn"], hold["member_id"]), None)
+        if hold["copy_id"] is None:
+            self._active_holds[hold["isbn"]] -= 1  # stays in the deque until it reaches the front
+        else:
+            self._ready.pop((hold["isbn"], hold["member_id"]), None)
+            self._release(self.copies[hold["copy_id"]])
+        return True
+
+    @staticmethod
+    def _front(queue: Optional[deque]) -> Optional[Dict[str, Any]]:
+        """Oldest active hold in one queue; cancelled holds are dropped as they surface."""
+        while queue and not queue[0]["active"]:
+            queue.popleft()
+        return queue[0] if queue else None
+
+    def _waiting(self, isbn: str, branch_id: Any = None, any_branch: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Oldest hold a copy at ``branch_id`` can fill: holds for that branch or for
+        any branch. With any_branch=True (copies of unknown location, or
+        next_in_line) every queue is considered. Hold ids increase, so the
+        smallest id among the queue fronts is the oldest.
+        """
+        queues = self._holds.get(isbn, {})
+        if any_branch:
+            fronts = (self._front(q) for q in queues.values())
+        else:
+            fronts = (self._front(queues.get(branch_id)), self._front(queues.get(None)))
+        return min((h for h in fronts if h is not None), key=lambda h: h["hold_id"], default=None)
+
+    def _pop_hold(self, isbn: str, branch_id: Any = None) -> Optional[Dict[str, Any]]:
+        hold = self._waiting(isbn, branch_id, any_branch=branch_id is None)
+        if hold is not None:
+            self._holds[isbn][hold["branch_id"]].popleft()
+            self._active_holds[isbn] -= 1
+        return hold
+
+    def next_in_line(self, isbn: str) -> Optional[Any]:
+        """Member id of the oldest hold still waiting for a copy, or None."""
+        hold = self._waiting(isbn)
+        return hold["member_id"] if hold else None
+
+    def queue_length(self, isbn: str) -> int:
+        """Number of holds still waiting for a copy."""
+        return self._active_holds.get(isbn, 0)
+
+    def __repr__(self):
+        return f"HoldingsManager(copies={len(self.copies)}, titles={len(self._available)})"
@@ -1,9 +1,11 @@
 import logging
 import unicodedata
-import difflib
 from datetime import datetime
 from typing import List, Dict, Any, Tuple, Optional
 
+from .search_cache import SearchCache, bump_catalog_version
+from .similarity import similarity_scores
+
 
 class SearchandDashboard:
     """
@@ -13,6 +15,11 @@ class SearchandDashboard:
     ----------
     _data_source : list
         A list of dictionaries representing books.
+    _cache : SearchCache or None
+        Opt-in LRU cache of ranked results (cache_size > 0). It is invalidated
+        when data_source is reassigned or the catalog version is bumped
+        (add_new_book, remove_book, ...); after editing the list in place,
+        call bump_catalog_version(sd.data_source).
 
     Example
     -------
@@ -26,10 +33,11 @@ class SearchandDashboard:
     1
     """
 
-    def __init__(self, data_source: List[Dict[str, Any]]):
+    def __init__(self, data_source: List[Dict[str, Any]], cache_size: int = 0):
         if not isinstance(data_source, list):
             raise TypeError("data_source must be a list of dictionaries")
         self._data_source = data_source  # private attribute
+        self._cache = SearchCache(cache_size) if cache_size > 0 else None
 
     # ---------- Properties for Controlled Access ----------
     @property
@@ -42,6 +50,11 @@ class SearchandDashboard:
         if not isinstance(new_data, list):
             raise TypeError("data_source must be a list of dictionaries")
         self._data_source = new_data
+        bump_catalog_version(new_data)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss statistics of the search result cache."""
+        return self._cache.stats() if self._cache is not None else {}
 
     # ---------- Utility Methods ----------
     @staticmethod
@@ -74,6 +87,7 @@ class SearchandDashboard:
         fuzzy: bool = True,
         min_ratio: float = 0.65,
         limit: int = 25,
+        similarity: str = "bitparallel",
     ) -> Dict[str, Any]:
         """
         Search for books by title, author, or ISBN with fuzzy matching.
@@ -84,6 +98,9 @@ class SearchandDashboard:
             Search string
         limit : int
             Maximum results returned
+        similarity : str
+            Fuzzy backend: the batched "bitparallel" (default) or "difflib"
+            for the legacy SequenceMatcher scores (see similarity.py)
 
         Returns
         -------
@@ -99,15 +116,31 @@ class SearchandDashboard:
             return {"total": 0, "results": []}
 
         qnorm = self._normalize_text(query)
+
+        key = None
+        if self._cache is not None:
+            key = self._cache.make_key(self._data_source, qnorm, fields=tuple(fields), fuzzy=fuzzy,
+                                       min_ratio=min_ratio, similarity=similarity)
+            ranked = self._cache.get(key, self._data_source)
+            if ranked is not None:
+                results = ranked[:limit]
+                return {"total": len(results), "results": results}
+
         qtokens = set(self._tokenize(query))
 
         weights = {"title": 1.0, "author": 0.7, "isbn": 0.9}
         scored = []
 
-        for book in self._data_source:
+        values = {f: [self._normalize_text(b.get(f, "")) for b in self._data_source] for f in fields}
+        ratios = {
+            f: similarity_scores(qnorm, values[f], similarity)
+            for f in fields if fuzzy and f in ("title", "author")
+        }
+
+        for i, book in enumerate(self._data_source):
             score = 0.0
             for f in fields:
-                val = self._normalize_text(book.get(f, ""))
+                val = values[f][i]
                 if not val:
                     continue
 
@@ -118,8 +151,8 @@ class SearchandDashboard:
                 if overlap:
                     score += weights.get(f, 0.5) * min(0.75, 0.15 * overlap)
 
-                if fuzzy and f in ("title", "author"):  # fuzzy
-                    ratio = difflib.SequenceMatcher(None, qnorm, val).ratio()
+                if f in ratios:  # fuzzy
+                    ratio = ratios[f][i]
                     if ratio >= min_ratio:
                         score += weights.get(f, 0.5) * (ratio ** 2)
 
@@ -127,7 +160,10 @@ class SearchandDashboard:
                 scored.append((score, book))
 
         scored.sort(key=lambda x: (-x[0], self._normalize_text(x[1].get("title", ""))))
-        results = [b for _, b in scored][:limit]
+        ranked = [b for _, b in scored]
+        if key is not None:
+            self._cache.put(key, self._data_source, ranked)
+        results = ranked[:limit]
 
         return {"total": len(results), "results": results}
 
@@ -9,18 +9,56 @@ that supports reporting and analytics for library operations.
 Modules:
     library_name: Core functions and main interface.
     utils: Helper utilities (e.g., data formatting, logging, etc.).
+    member_bitmaps: Per-month member bitmaps for active/retained/churned counts.
+    sketches: Mergeable HyperLogLog / Count-Min / space-saving sketches.
+    ingest: Tail-and-ingest of appended issued_status / return_status rows.
+    search_cache: Versioned LRU cache for search results.
+    fines: Bulk vectorized late-fee assessment in integer cents.
+    HoldingsManager: Copy-level holdings with availability counters and hold queues.
+    typeahead: Popularity-ranked prefix completion for titles and authors.
+    dataset_validation: Vectorized integrity checks across the six dataset tables.
+    export: Streaming CSV / JSON Lines / Parquet export of report rows.
+    loan_partitions: Month-partitioned loan history with partition pruning.
+    similarity: Batched fuzzy-match backends (difflib, bit-parallel LCS).
+    dedup: Blocked duplicate-title detection across catalog sources.
+    sharding: Branch-sharded circulation over worker processes with a router.
 """
 
 from .library_name import (
-    generate_dashboard,
     load_library_data,
+    load_library_tables,
     create_report,
-)
-
-from .utils import (
     setup_logger,
     validate_input,
 )
 
+from .main_function_library_ import generate_dashboard
+
+from .member_bitmaps import MemberBitmapIndex
+
+from .sketches import HyperLogLog, CountMinSketch, SpaceSaving
+
+from .ingest import TailReader, IncrementalIngestor
+
+from .search_cache import SearchCache, catalog_version, bump_catalog_version
+
+from .fines import build_loans_frame, assess_fines, fine_rollup, fine_summary
+
+from .HoldingsManager import HoldingsManager
+
+from .typeahead import TypeaheadIndex
+
+from .dataset_validation import validate_dataset, validation_summary
+
+from .export import export_rows, iter_monthly_report_rows, iter_loan_rows, print_sink
+
+from .loan_partitions import PartitionedLoanStore
+
+from .similarity import similarity_scores
+
+from .dedup import find_duplicates, load_kaggle_books, records_from_books_table, records_from_catalog
+
+from .sharding import ShardedLibrary, assign_branches, serve_shard
+
 __version__ = "1.0.0"
 __author__ = " 0202 Library/Information Center Management System -  Reporting and Analytics Dashboard"
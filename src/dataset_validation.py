@@ -0,0 +1,156 @@
+"""
+dataset_validation.py — Vectorized integrity checks for the library dataset.
+
+validate_input() only checks a handful of column names. validate_dataset()
+checks the six library_management_system tables as a whole: primary-key
+uniqueness, foreign keys, return-after-issue ordering and value domains.
+Every rule is a column-wise pandas operation (isin / duplicated / merge), so
+the cost is a few passes over each table regardless of row count.
+"""
+
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+PRIMARY_KEYS = {
+    "books": "isbn",
+    "branch": "branch_id",
+    "employees": "emp_id",
+    "issued_status": "issued_id",
+    "members": "member_id",
+    "return_status": "return_id",
+}
+
+# (child table, child column, parent table, parent column)
+FOREIGN_KEYS = [
+    ("issued_status", "issued_member_id", "members", "member_id"),
+    ("issued_status", "issued_book_isbn", "books", "isbn"),
+    ("issued_status", "issued_emp_id", "employees", "emp_id"),
+    ("return_status", "issued_id", "issued_status", "issued_id"),
+    ("employees", "branch_id", "branch", "branch_id"),
+    ("branch", "manager_id", "employees", "emp_id"),
+]
+
+DATE_COLUMNS = [
+    ("members", "reg_date"),
+    ("issued_status", "issued_date"),
+    ("return_status", "return_date"),
+]
+
+
+def _result(frame: pd.DataFrame, mask: pd.Series, sample_size: int) -> Dict[str, Any]:
+    return {
+        "violations": int(mask.sum()),
+        "sample": frame.loc[mask].head(sample_size).to_dict("records"),
+    }
+
+
+def _skipped(reason: str) -> Dict[str, Any]:
+    return {"violations": None, "sample": [], "skipped": reason}
+
+
+def _has(tables: Dict[str, pd.DataFrame], table: str, *cols: str) -> Optional[str]:
+    """Return a skip reason if the table or any column is missing."""
+    if table not in tables:
+        return f"table '{table}' not loaded"
+    missing = [c for c in cols if c not in tables[table].columns]
+    return f"{table} missing columns {missing}" if missing else None
+
+
+def validate_dataset(tables: Dict[str, pd.DataFrame], sample_size: int = 5) -> Dict[str, Dict[str, Any]]:
+    """
+    Run every integrity rule over the dataset tables.
+
+    Args:
+        tables (dict): Table name -> DataFrame, e.g. from load_library_tables().
+        sample_size (int): Offending rows returned per rule.
+
+    Returns:
+        dict: Rule name -> {"violations": int, "sample": [row, ...]}. Rules
+        whose tables/columns are missing report violations=None and a
+        "skipped" reason instead.
+    """
+    report: Dict[str, Dict[str, Any]] = {}
+
+    # 1. Primary keys: present and unique
+    for table, key in PRIMARY_KEYS.items():
+        rule = f"pk_unique:{table}.{key}"
+        reason = _has(tables, table, key)
+        if reason:
+            report[rule] = _skipped(reason)
+            continue
+        df = tables[table]
+        report[rule] = _result(df, df[key].isna() | df[key].duplicated(keep=False), sample_size)
+
+    # 2. Foreign keys: every non-null child value exists in the parent
+    for child, col, parent, pcol in FOREIGN_KEYS:
+        rule = f"fk:{child}.{col}->{parent}.{pcol}"
+        reason = _has(tables, child, col) or _has(tables, parent, pcol)
+        if reason:
+            report[rule] = _skipped(reason)
+            continue
+        df = tables[child]
+        report[rule] = _result(df, df[col].notna() & ~df[col].isin(tables[parent][pcol]), sample_size)
+
+    # 3. Dates parse
+    parsed: Dict[Tuple[str, str], pd.Series] = {}
+    for table, col in DATE_COLUMNS:
+        rule = f"domain:{table}.{col}_is_date"
+        reason = _has(tables, table, col)
+        if reason:
+            report[rule] = _skipped(reason)
+            continue
+        df = tables[table]
+        parsed[(table, col)] = pd.to_datetime(df[col], errors="coerce", format="%Y-%m-%d")
+        report[rule] = _result(df, df[col].notna() & parsed[(table, col)].isna(), sample_size)
+
+    # 4. Return on/after issue, and return isbn matches the issued isbn
+    rule = "order:return_date>=issued_date"
+    if ("return_status", "return_date") in parsed and ("issued_status", "issued_date") in parsed:
+        issued = tables["issued_status"]
+        issue_dates = pd.Series(parsed[("issued_status", "issued_date")].to_numpy(), index=issued["issued_id"])
+        issue_dates = issue_dates[~issue_dates.index.duplicated()]
+        returns = tables["return_status"]
+        issued_on = returns["issued_id"].map(issue_dates)
+        report[rule] = _result(returns, parsed[("return_status", "return_date")] < issued_on, sample_size)
+
+        if "return_book_isbn" in returns.columns and "issued_book_isbn" in issued.columns:
+            issued_isbn = returns["issued_id"].map(issued.drop_duplicates("issued_id").set_index("issued_id")["issued_book_isbn"])
+            mismatch = returns["return_book_isbn"].notna() & issued_isbn.notna() & (returns["return_book_isbn"] != issued_isbn)
+            report["consistency:return_status.return_book_isbn"] = _result(returns, mismatch, sample_size)
+    else:
+        report[rule] = _skipped("issue/return dates unavailable")
+
+    # 5. Value domains
+    domain_rules: List[Tuple[str, str, str, Callable[[pd.Series], pd.Series]]] = [
+        ("domain:books.rental_price>=0", "books", "rental_price",
+         lambda s: pd.to_numeric(s, errors="coerce").isna() | (pd.to_numeric(s, errors="coerce") < 0)),
+        ("domain:books.status_in_yes_no", "books", "status",
+         lambda s: ~s.astype(str).str.lower().isin(["yes", "no"])),
+        ("domain:employees.salary>0", "employees", "salary",
+         lambda s: pd.to_numeric(s, errors="coerce").isna() | (pd.to_numeric(s, errors="coerce") <= 0)),
+        ("domain:books.isbn_format", "books", "isbn",
+         lambda s: ~s.astype(str).str.replace("-", "", regex=False).str.fullmatch(r"\d{9}[\dXx]|\d{13}")),
+    ]
+    for rule, table, col, bad in domain_rules:
+        reason = _has(tables, table, col)
+        if reason:
+            report[rule] = _skipped(reason)
+            continue
+        df = tables[table]
+        report[rule] = _result(df, bad(df[col]).fillna(True), sample_size)
+
+    failed = [r for r, v in report.items() if v["violations"]]
+    if failed:
+        logging.warning(f"Dataset validation found violations in: {failed}")
+    else:
+        logging.info("Dataset validation passed.")
+    return report
+
+
+def validation_summary(report: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+    """One row per rule with its violation count (or skip reason)."""
+    return pd.DataFrame(
+        [{"rule": rule, "violations": r["violations"], "skipped": r.get("skipped", "")} for rule, r in report.items()]
+    ).set_index("rule")
@@ -0,0 +1,286 @@
+"""
+dedup.py — Duplicate-title detection across catalog sources.
+
+add_new_book() only rejects an exact ISBN that is already in the list. The
+same work also turns up under other ISBNs (editions, the Kaggle books dump
+vs our books.csv) and with spelling variants. find_duplicates() resolves
+these in three steps:
+
+    1. Blocking: every record gets a few cheap keys (ISBN-13, author surname
+       + each title token, the compact title, and head/tail fragments of the
+       title and surname so a single typo in either still shares a key).
+       Only records that share a key become candidate pairs, and blocks
+       larger than ``max_block`` are dropped as uninformative, so the pair
+       count grows with block sizes, not with n**2.
+    2. Scoring: candidate pairs are scored in batches with the repo's
+       normalization and similarity backends (paired bit-parallel LCS ratio).
+    3. Clustering: pairs above the threshold are merged with union-find.
+
+    records = records_from_books_table(tables["books"]) + load_kaggle_books("data/Books.csv")
+    clusters = find_duplicates(records)
+"""
+
+import logging
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .main_function_library_ import _normalize_text
+from .similarity import paired_ratios
+
+# Kaggle "books-dataset" (Book-Crossing) layout: semicolon separated, latin-1
+KAGGLE_COLUMNS = {"ISBN": "isbn", "Book-Title": "title", "Book-Author": "author", "Year-Of-Publication": "year"}
+# data/library_management_system/books.csv layout
+BOOKS_TABLE_COLUMNS = {"isbn": "isbn", "book_title": "title", "author": "author"}
+
+STOPWORDS = frozenset("a an the of and in on to for with at by from de la le el les der die das".split())
+
+_NON_ALNUM = re.compile(r"[^a-z0-9 ]+")
+_SUBTITLE = re.compile(r"\s*[:(\[].*$")
+
+
+# ---------- Sources ----------
+def _records(frame: pd.DataFrame, columns: Dict[str, str], source: str) -> List[Dict[str, Any]]:
+    frame = frame[[c for c in columns if c in frame.columns]].rename(columns=columns)
+    frame = frame.astype(object).where(frame.notna(), None)
+    records = frame.to_dict("records")
+    for rec in records:
+        rec["source"] = source
+    return records
+
+
+def load_kaggle_books(path: str, source: str = "kaggle") -> List[Dict[str, Any]]:
+    """
+    Load the Kaggle books dump (see data/book_dataset_.txt for the link) as dedup records.
+
+    Returns:
+        list: Dicts with title, author, isbn, year and source. Empty on read errors.
+    """
+    try:
+        frame = pd.read_csv(path, sep=";", encoding="latin-1", dtype=str, on_bad_lines="skip",
+                            usecols=lambda c: c in KAGGLE_COLUMNS)
+    except (FileNotFoundError, ValueError) as e:
+        logging.error(f"Could not load Kaggle books from {path}: {e}")
+        return []
+    return _records(frame, KAGGLE_COLUMNS, source)
+
+
+def records_from_books_table(frame: pd.DataFrame, source: str = "books.csv") -> List[Dict[str, Any]]:
+    """Dedup records from the library_management_system books table."""
+    return _records(frame, BOOKS_TABLE_COLUMNS, source)
+
+
+def records_from_catalog(catalog: Iterable[Dict[str, Any]], source: str = "catalog") -> List[Dict[str, Any]]:
+    """Dedup records from an in-memory catalog (add_new_book / import_books_from_csv rows)."""
+    return [
+        {"title": b.get("title"), "author": b.get("author"), "isbn": b.get("isbn"), "id": b.get("id"),
+         "source": source}
+        for b in catalog
+    ]
+
+
+# ---------- Normalization ----------
+def isbn13(isbn: Any) -> Optional[str]:
+    """Canonical ISBN-13 (ISBN-10s are converted); None if the value is not an ISBN."""
+    digits = re.sub(r"[^0-9Xx]", "", str(isbn or "")).upper()
+    if len(digits) == 10 and digits[:9].isdigit():
+        core = "978" + digits[:9]
+    elif len(digits) == 13 and digits.isdigit():
+        return digits
+    else:
+        return None
+    check = (10 - sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(core)) % 10) % 10
+    return core + str(check)
+
+
+def title_key(title: Any) -> str:
+    """Main title (subtitle and bracketed series dropped), without punctuation or stopwords."""
+    text = _SUBTITLE.sub("", _normalize_text(title)) or _normalize_text(title)
+    tokens = _NON_ALNUM.sub(" ", text.replace("&", " and ")).split()
+    kept = [t for t in tokens if t not in STOPWORDS]
+    return " ".join(kept or tokens)
+
+
+def author_key(author: Any) -> Tuple[str, str]:
+    """(surname, normalized full name); handles "Last, First" and "J.D. Last"."""
+    text = _normalize_text(author)
+    if "," in text:
+        last, first = text.split(",", 1)
+        text = f"{first} {last}"
+        surname_part = last
+    else:
+        surname_part = text
+    tokens = [t for t in _NON_ALNUM.sub(" ", surname_part).split() if len(t) > 1]
+    surname = tokens[-1] if tokens else ""
+    return surname, " ".join(_NON_ALNUM.sub(" ", text).split())
+
+
+def blocking_keys(title: str, surname: str, isbn: Optional[str]) -> List[Tuple[str, ...]]:
+    """Candidate keys for one normalized record."""
+    keys: List[Tuple[str, ...]] = []
+    if isbn:
+        keys.append(("isbn", isbn))
+    tokens = title.split()
+    if title:
+        keys.append(("title", title.replace(" ", "")))
+    if surname:
+        keys.extend(("author_token", surname, t) for t in set(tokens) if len(t) > 1)
+    if surname and title:
+        # a single misspelling leaves either the head or the tail of a word intact
+        compact = title.replace(" ", "")
+        keys.append(("title_head", surname, compact[:5]))
+        keys.append(("title_tail", surname, compact[-5:]))
+        keys.append(("author_head", surname[:4], tokens[0]))
+        keys.append(("author_tail", surname[-4:], tokens[0]))
+    return keys
+
+
+# ---------- Candidate pairs ----------
+def candidate_pairs(keys: List[List[Tuple[str, ...]]], max_block: int = 200) -> np.ndarray:
+    """
+    Unique (i, j) pairs, i < j, of records that share at least one blocking key.
+
+    Blocks are bucketed by size so each size is expanded with one vectorized
+    triangle-index gather. Blocks larger than ``max_block`` are skipped.
+
+    Returns:
+        ndarray: int64 array of shape (pairs, 2).
+    """
+    block_ids: Dict[Tuple[str, ...], int] = {}
+    rec_idx: List[int] = []
+    blk_idx: List[int] = []
+    for i, rec_keys in enumerate(keys):
+        for key in rec_keys:
+            rec_idx.append(i)
+            blk_idx.append(block_ids.setdefault(key, len(block_ids)))
+    if not rec_idx:
+        return np.empty((0, 2), dtype=np.int64)
+
+    rec = np.asarray(rec_idx, dtype=np.int64)
+    blk = np.asarray(blk_idx, dtype=np.int64)
+    order = np.lexsort((rec, blk))
+    rec, blk = rec[order], blk[order]
+    starts = np.flatnonzero(np.r_[True, blk[1:] != blk[:-1]])
+    sizes = np.diff(np.r_[starts, len(blk)])
+
+    oversized = int((sizes > max_block).sum())
+    if oversized:
+        logging.info(f"Skipping {oversized} blocking keys with more than {max_block} records.")
+
+    n = len(keys)
+    encoded = []
+    for size in np.unique(sizes[(sizes >= 2) & (sizes <= max_block)]):
+        first = starts[sizes == size]
+        members = rec[first[:, None] + np.arange(size)]  # (blocks, size), each row sorted
+        a, b = np.triu_indices(size, 1)
+        encoded.append((members[:, a] * n + members[:, b]).ravel())
+    if not encoded:
+        return np.empty((0, 2), dtype=np.int64)
+    codes = np.unique(np.concatenate(encoded))
+    return np.stack([codes // n, codes % n], axis=1)
+
+
+# ---------- Scoring ----------
+def _ratio_bound(strings: List[str], left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Upper bound on the similarity ratio of each pair from the string lengths alone."""
+    lengths = np.fromiter((len(s) for s in strings), dtype=np.int64, count=len(strings))
+    a, b = lengths[left], lengths[right]
+    return np.where(a + b > 0, 2.0 * np.minimum(a, b) / np.maximum(a + b, 1), 1.0)
+
+
+# ---------- Clustering ----------
+def _union_find(n: int, pairs: np.ndarray) -> np.ndarray:
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in pairs.tolist():
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    return np.fromiter((find(i) for i in range(n)), dtype=np.int64, count=n)
+
+
+def find_duplicates(
+    records: List[Dict[str, Any]],
+    *,
+    threshold: float = 0.88,
+    title_weight: float = 0.75,
+    max_block: int = 200,
+    backend: str = "bitparallel",
+    return_pairs: bool = False,
+):
+    """
+    Group records that describe the same work.
+
+    Args:
+        records (list): Dicts with title, author and (optional) isbn, e.g. from
+            load_kaggle_books(), records_from_books_table() or records_from_catalog().
+        threshold (float): Minimum pair score (0..1) to merge two records.
+        title_weight (float): Weight of the title ratio; the author ratio gets the rest.
+        max_block (int): Blocking keys shared by more records than this are ignored.
+        backend (str): Similarity backend for paired_ratios ("bitparallel" or "difflib").
+        return_pairs (bool): Also return the scored candidate pairs as a DataFrame.
+
+    Returns:
+        list: Clusters of two or more records, largest first. Each is
+        {"cluster_id", "size", "records": [record, ...]} where every record
+        carries its input position as "record_index". With return_pairs=True,
+        (clusters, pairs_frame) is returned.
+    """
+    n = len(records)
+    titles, authors, isbns, keys = [], [], [], []
+    for rec in records:
+        title = title_key(rec.get("title"))
+        surname, author = author_key(rec.get("author"))
+        isbn = isbn13(rec.get("isbn"))
+        titles.append(title)
+        authors.append(author)
+        isbns.append(isbn)
+        keys.append(blocking_keys(title, surname, isbn))
+
+    pairs = candidate_pairs(keys, max_block=max_block)
+    left, right = pairs[:, 0], pairs[:, 1]
+    isbn_codes = pd.factorize(pd.Series(isbns, dtype=object))[0]
+    same_isbn = (isbn_codes[left] == isbn_codes[right]) & (isbn_codes[left] >= 0)
+
+    # Prune before scoring: a ratio can never exceed 2 * min(len) / (len_a + len_b),
+    # and a pair whose title ratio is below title_floor cannot reach the threshold
+    # even with identical authors.
+    title_floor = (threshold - (1 - title_weight)) / title_weight if title_weight else 0.0
+    title_ratio = np.full(len(pairs), np.nan)
+    author_ratio = np.full(len(pairs), np.nan)
+    todo = ~same_isbn & (_ratio_bound(titles, left, right) >= title_floor)
+    title_ratio[todo] = paired_ratios([titles[i] for i in left[todo]], [titles[j] for j in right[todo]], backend)
+    todo &= title_ratio >= title_floor
+    author_ratio[todo] = paired_ratios([authors[i] for i in left[todo]], [authors[j] for j in right[todo]], backend)
+
+    score = np.where(same_isbn, 1.0,
+                     title_weight * np.nan_to_num(title_ratio) + (1 - title_weight) * np.nan_to_num(author_ratio))
+    matched = pairs[score >= threshold]
+    logging.info(f"Dedup: {n} records, {len(pairs)} candidate pairs, {int(todo.sum())} fully scored, "
+                 f"{len(matched)} matches.")
+
+    roots = _union_find(n, matched)
+    members: Dict[int, List[int]] = defaultdict(list)
+    for i in np.unique(matched).tolist():
+        members[int(roots[i])].append(i)
+    clusters = [
+        {"cluster_id": cid, "size": len(idx), "records": [{**records[i], "record_index": i} for i in idx]}
+        for cid, idx in enumerate(sorted(members.values(), key=lambda m: (-len(m), m[0])))
+    ]
+
+    if not return_pairs:
+        return clusters
+    pairs_frame = pd.DataFrame({
+        "left": left, "right": right, "title_ratio": title_ratio, "author_ratio": author_ratio,
+        "same_isbn": same_isbn, "score": score, "match": score >= threshold,
+    })
+    return clusters, pairs_frame
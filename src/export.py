@@ -0,0 +1,207 @@
+"""
+export.py — Streaming report export to CSV, JSON Lines and Parquet.
+
+Report producers here are generators that yield one flat dict per row, and the
+writers consume them incrementally, so an extract never exists as a full list
+or dict in memory. The console is just another sink (print_sink).
+
+    rows = iter_monthly_report_rows(catalog, users)
+    export_rows(rows, "monthly.parquet")
+"""
+
+import csv
+import itertools
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .library_name import _scan_monthly_activity
+
+Row = Dict[str, Any]
+
+
+# ---------- Producers ----------
+def iter_monthly_report_rows(catalog: List[Dict[str, Any]], users: Iterable[Dict[str, Any]],
+                             now: Optional[datetime] = None, approximate: bool = False) -> Iterator[Row]:
+    """
+    Stream the monthly report as (section, item, value, count) rows.
+
+    Sections: "summary", "top_borrowed", "overdue" and one "user" row per user
+    (value "active" with loan count, or "inactive"). Users are streamed, so the
+    active/inactive name lists are never built.
+    """
+    now = now or datetime.now()
+    borrowed, activity, overdue = _scan_monthly_activity(catalog, now, approximate)
+    total = borrowed.total if approximate else sum(borrowed.values())
+
+    yield {"section": "summary", "item": "month", "value": now.strftime("%B %Y"), "count": None}
+    yield {"section": "summary", "item": "total_books", "value": None, "count": len(catalog)}
+    yield {"section": "summary", "item": "borrowed_this_month", "value": None, "count": total}
+    for title, count in borrowed.most_common(5):
+        yield {"section": "top_borrowed", "item": title, "value": None, "count": count}
+    for title in overdue:
+        yield {"section": "overdue", "item": title, "value": None, "count": None}
+
+    seen = set()
+    for user in users:
+        uid = user.get("id")
+        seen.add(uid)
+        loans = activity.get(uid, 0)
+        yield {"section": "user", "item": user.get("name"), "value": "active" if loans else "inactive",
+               "count": loans}
+    for uid, loans in activity.items():  # borrowers missing from the user list
+        if uid not in seen:
+            yield {"section": "user", "item": f"User {uid}", "value": "active", "count": loans}
+
+
+def iter_loan_rows(catalog: List[Dict[str, Any]]) -> Iterator[Row]:
+    """Circulation extract: one row per borrow_history record."""
+    for book in catalog:
+        for rec in book.get("borrow_history", []):
+            yield {
+                "book_id": book.get("id"),
+                "isbn": book.get("isbn"),
+                "title": book.get("title"),
+                "user_id": rec.get("user_id"),
+                "borrow_date": rec.get("borrow_date"),
+                "due_date": rec.get("due_date"),
+                "return_date": rec.get("return_date"),
+            }
+
+
+def iter_frame_rows(frame, chunksize: int = 10_000) -> Iterator[Row]:
+    """Rows of a DataFrame (e.g. assess_fines output), converted a chunk at a time."""
+    for start in range(0, len(frame), chunksize):
+        yield from frame.iloc[start:start + chunksize].to_dict("records")
+
+
+# ---------- Sinks ----------
+def _native(value: Any) -> Any:
+    """numpy scalars -> Python, NaN/NaT -> None; datetimes are kept."""
+    if value is None or isinstance(value, (str, int)):
+        return value
+    if value != value:  # NaN and NaT
+        return None
+    if hasattr(value, "item") and not isinstance(value, datetime):
+        return value.item()
+    return value
+
+
+def _plain(value: Any) -> Any:
+    """JSON/CSV-safe form of a value (dates become ISO strings)."""
+    value = _native(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _peek(rows: Iterable[Row]):
+    rows = iter(rows)
+    first = next(rows, None)
+    return first, (itertools.chain([first], rows) if first is not None else iter(()))
+
+
+def write_csv(rows: Iterable[Row], path: str, fieldnames: Optional[List[str]] = None) -> int:
+    """Stream rows to CSV. Columns default to the keys of the first row."""
+    first, rows = _peek(rows)
+    n = 0
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        if first is None and fieldnames is None:
+            return 0
+        writer = csv.DictWriter(fh, fieldnames=fieldnames or list(first), extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: _plain(v) for k, v in row.items()})
+            n += 1
+    return n
+
+
+def write_jsonl(rows: Iterable[Row], path: str) -> int:
+    """Stream rows to JSON Lines (one object per line)."""
+    n = 0
+    with open(path, "w", encoding="utf-8") as fh:
+        for row in rows:
+            fh.write(json.dumps({k: _plain(v) for k, v in row.items()}, default=str))
+            fh.write("\n")
+            n += 1
+    return n
+
+
+def write_parquet(rows: Iterable[Row], path: str, batch_size: int = 50_000, schema=None,
+                  infer_batches: int = 20) -> int:
+    """
+    Stream rows to Parquet, one row group per ``batch_size`` rows.
+
+    Requires pyarrow. Pass ``schema`` (a pyarrow.Schema) to fix column types up
+    front. Otherwise the schema is inferred, and batches are held back
+    (up to ``infer_batches``) while any column is still all-null. A column that
+    is empty in the first batch, such as return_date in iter_loan_rows, then
+    gets its real type from a later batch instead of being frozen as null.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow).") from e
+
+    def batches():
+        it = iter(rows)
+        while True:
+            batch = [{k: _native(v) for k, v in row.items()} for row in itertools.islice(it, batch_size)]
+            if not batch:
+                return
+            yield batch
+
+    stream = batches()
+    held: List[List[Row]] = []
+    if schema is None:
+        schemas = []
+        for batch in stream:
+            held.append(batch)
+            schemas.append(pa.Table.from_pylist(batch).schema)
+            schema = pa.unify_schemas(schemas, promote_options="permissive")
+            if len(held) >= infer_batches or not any(pa.types.is_null(f.type) for f in schema):
+                break
+        if not held:
+            return 0
+
+    n = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for batch in itertools.chain(held, stream):
+            try:
+                table = pa.Table.from_pylist(batch, schema=schema)
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                raise ValueError(f"Row {n}+ does not match the Parquet schema ({e}); "
+                                 f"pass schema= to write_parquet/export_rows.") from e
+            writer.write_table(table)
+            n += len(batch)
+    return n
+
+
+def print_sink(rows: Iterable[Row], out: Callable[[str], None] = print) -> int:
+    """Console sink: one line per row."""
+    n = 0
+    for row in rows:
+        out(" | ".join(f"{k}={_plain(v)}" for k, v in row.items() if v is not None))
+        n += 1
+    return n
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "parquet": write_parquet}
+
+
+def export_rows(rows: Iterable[Row], path: str, fmt: Optional[str] = None, **kwargs) -> int:
+    """
+    Write a row stream to ``path``; the format defaults to the file extension.
+
+    Returns:
+        int: Number of rows written.
+    """
+    fmt = (fmt or path.rsplit(".", 1)[-1]).lower()
+    fmt = "jsonl" if fmt in ("json", "ndjson") else fmt
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    n = WRITERS[fmt](rows, path, **kwargs)
+    logging.info(f"Exported {n} rows to {path}.")
+    return n
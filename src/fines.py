@@ -0,0 +1,199 @@
+"""
+fines.py — Bulk, vectorized late-fee assessment in integer cents.
+
+Fines for every open and closed loan are computed at once from due/return date
+arrays: days late -> per-day rate (by category, overridden per member) ->
+per-loan cap, all as int64 cents so totals never drift the way summed floats
+do. Roll-ups by member, branch and month are grouped sums over the result.
+
+Rate tables are plain dicts of cents:
+    rates        = {"default": 25, "Children": 10}      # per day, by category
+    member_rates = {"C101": 0}                          # per day, overrides category
+    caps         = {"default": 1000, "Reference": 2500} # max per loan
+"""
+
+import logging
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_RATES = {"default": 25}
+DEFAULT_CAPS: Dict[str, int] = {}
+
+
+def to_cents(amount) -> int:
+    """Convert a dollar amount (float/str/Decimal) to integer cents, rounding half up."""
+    return int((Decimal(str(amount)) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def cents_to_dollars(cents: int) -> str:
+    """Format integer cents as '$12.34'."""
+    sign = "-" if cents < 0 else ""
+    return f"{sign}${abs(int(cents)) // 100}.{abs(int(cents)) % 100:02d}"
+
+
+# ---------- Building the loans table ----------
+def build_loans_frame(tables: Dict[str, pd.DataFrame], loan_period: int = 14) -> pd.DataFrame:
+    """
+    Join the library_management_system tables into one row per loan.
+
+    Args:
+        tables (dict): Output of load_library_tables() (needs issued_status;
+            return_status, books and employees are joined when present).
+        loan_period (int): Days from issue to due date.
+
+    Returns:
+        DataFrame: issued_id, member_id, isbn, category, branch_id,
+        issue_date, due_date, return_date (NaT while open).
+    """
+    issued = tables["issued_status"]
+    loans = pd.DataFrame({
+        "issued_id": issued["issued_id"],
+        "member_id": issued["issued_member_id"],
+        "isbn": issued["issued_book_isbn"],
+        "issue_date": pd.to_datetime(issued["issued_date"], errors="coerce"),
+    })
+    loans["due_date"] = loans["issue_date"] + pd.Timedelta(days=loan_period)
+
+    returns = tables.get("return_status")
+    if returns is not None:
+        first_return = (returns.assign(return_date=pd.to_datetime(returns["return_date"], errors="coerce"))
+                        .groupby("issued_id")["return_date"].min())
+        loans["return_date"] = loans["issued_id"].map(first_return)
+    else:
+        loans["return_date"] = pd.NaT
+
+    books = tables.get("books")
+    loans["category"] = loans["isbn"].map(books.set_index("isbn")["category"]) if books is not None else None
+    employees = tables.get("employees")
+    loans["branch_id"] = (issued["issued_emp_id"].map(employees.set_index("emp_id")["branch_id"])
+                          if employees is not None else None)
+    return loans
+
+
+def loans_from_catalog(catalog: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Flatten in-memory ``borrow_history`` records into the same loans table."""
+    rows = [
+        {
+            "issued_id": rec.get("issued_id"),
+            "member_id": rec.get("user_id"),
+            "isbn": book.get("isbn"),
+            "category": book.get("category"),
+            "branch_id": book.get("branch_id"),
+            "issue_date": rec.get("borrow_date"),
+            "due_date": rec.get("due_date"),
+            "return_date": rec.get("return_date"),
+        }
+        for book in catalog
+        for rec in book.get("borrow_history", [])
+    ]
+    loans = pd.DataFrame(rows, columns=["issued_id", "member_id", "isbn", "category", "branch_id",
+                                        "issue_date", "due_date", "return_date"])
+    for col in ("issue_date", "due_date", "return_date"):
+        loans[col] = pd.to_datetime(loans[col], errors="coerce")
+    return loans
+
+
+# ---------- Assessment ----------
+def _lookup(keys: pd.Series, table: Dict[str, int], default: int) -> np.ndarray:
+    # fillna() would route the default through float64 and overflow near int64 max
+    found = keys.map(table)
+    return np.where(found.notna(), found.fillna(0).to_numpy(dtype=np.int64), np.int64(table.get("default", default)))
+
+
+def assess_fines(
+    loans: pd.DataFrame,
+    *,
+    as_of=None,
+    project_to=None,
+    rates: Optional[Dict[str, int]] = None,
+    member_rates: Optional[Dict[str, int]] = None,
+    caps: Optional[Dict[str, int]] = None,
+    grace_days: int = 0,
+) -> pd.DataFrame:
+    """
+    Compute accrued and projected fines for every loan in one vectorized pass.
+
+    Args:
+        loans (DataFrame): Output of build_loans_frame() / loans_from_catalog().
+        as_of: Date open loans are assessed at (default: today).
+        project_to: Date to project open-loan fines to, e.g. the next billing
+            run (default: as_of). Closed loans project to their accrued fine.
+        rates (dict): Category -> cents per day, with a "default" key.
+        member_rates (dict): Member id -> cents per day; overrides category rates.
+        caps (dict): Category -> max cents per loan, optional "default" key.
+        grace_days (int): Days past due before fines start.
+
+    Returns:
+        DataFrame: ``loans`` plus status, days_late, rate_cents, accrued_cents,
+        projected_cents and month (month the fine is billed in).
+    """
+    rates = rates or DEFAULT_RATES
+    caps = caps if caps is not None else DEFAULT_CAPS
+    as_of = pd.Timestamp(as_of if as_of is not None else pd.Timestamp.today()).normalize()
+    project_to = pd.Timestamp(project_to).normalize() if project_to is not None else as_of
+
+    out = loans.copy()
+    due = out["due_date"].to_numpy(dtype="datetime64[D]")
+    returned = out["return_date"].notna().to_numpy()
+    end = np.where(returned, out["return_date"].to_numpy(dtype="datetime64[D]"), np.datetime64(as_of.date(), "D"))
+    proj_end = np.where(returned, end, np.datetime64(project_to.date(), "D"))
+
+    rate = _lookup(out["category"], rates, DEFAULT_RATES["default"])
+    if member_rates:
+        override = out["member_id"].map(member_rates)
+        rate = np.where(override.notna(), override.fillna(0).to_numpy(dtype=np.int64), rate)
+    no_cap = np.iinfo(np.int64).max
+    cap = _lookup(out["category"], caps, no_cap) if caps else no_cap
+
+    def _fine(stop):
+        days = np.clip((stop - due).astype(np.int64) - grace_days, 0, None)
+        days = np.where(np.isnat(due), 0, days)
+        return days, np.minimum(days * rate, cap)
+
+    days_late, accrued = _fine(end)
+    _, projected = _fine(proj_end)
+
+    out["status"] = np.where(returned, "closed", "open")
+    out["days_late"] = days_late
+    out["rate_cents"] = rate
+    out["accrued_cents"] = accrued.astype(np.int64)
+    out["projected_cents"] = projected.astype(np.int64)
+    out["month"] = end.astype("datetime64[M]").astype(str)
+    logging.info(f"Assessed fines for {len(out)} loans as of {as_of.date()}.")
+    return out
+
+
+def fine_rollup(
+    assessed: pd.DataFrame,
+    by: Sequence[str] = ("member_id", "branch_id", "month"),
+) -> Dict[str, pd.DataFrame]:
+    """
+    Total accrued/projected cents and late-loan counts per member, branch and month.
+
+    Returns:
+        dict: Dimension name -> DataFrame indexed by that dimension.
+    """
+    values = assessed[["accrued_cents", "projected_cents"]].assign(
+        late_loans=(assessed["days_late"] > 0).astype(np.int64))
+    return {dim: values.groupby(assessed[dim].fillna("unknown")).sum() for dim in by}
+
+
+def fine_summary(assessed: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Headline totals for the financial dashboard.
+
+    There is no payment data, so closed_total is what accrued on returned
+    loans, not what was collected.
+    """
+    open_mask = assessed["status"] == "open"
+    return {
+        "loans": len(assessed),
+        "late_loans": int((assessed["days_late"] > 0).sum()),
+        "accrued_total": cents_to_dollars(int(assessed["accrued_cents"].sum())),
+        "closed_total": cents_to_dollars(int(assessed.loc[~open_mask, "accrued_cents"].sum())),
+        "outstanding_total": cents_to_dollars(int(assessed.loc[open_mask, "accrued_cents"].sum())),
+        "projected_total": cents_to_dollars(int(assessed["projected_cents"].sum())),
+    }
@@ -0,0 +1,296 @@
+"""
+ingest.py — Tail-and-ingest for the append-only circulation CSV files.
+
+The circulation system appends rows to issued_status.csv and return_status.csv
+all day. Instead of re-reading whole files, TailReader remembers a byte offset
+per file and parses only the newly appended, complete lines. IncrementalIngestor
+turns those rows into issue/return events and pushes them into an in-memory
+catalog (list of book dicts), running report aggregates and any subscribers,
+so refreshing the dashboard costs time proportional to the new data only.
+"""
+
+import csv
+import json
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from .search_cache import bump_catalog_version
+
+_NULLS = {"", "NULL", "null", "NaN"}
+_FINGERPRINT_BYTES = 256
+
+
+class TailReader:
+    """
+    Incrementally read appended rows from CSV files.
+
+    Only complete lines are consumed: a partially written trailing line is left
+    in place and picked up by the next poll. A file is treated as rotated and
+    read again from the start when it is replaced (different inode), shrinks,
+    or its first bytes no longer match the ones already read; the last check
+    catches a copytruncate rotation that has grown past the old offset again.
+
+    Rows appended to the old file between the last poll and a rename
+    rotation are not read: the reader only follows the path.
+
+    Example
+    -------
+    >>> tail = TailReader()
+    >>> rows = tail.poll("data/library_management_system/issued_status.csv")
+    >>> tail.poll("data/library_management_system/issued_status.csv")  # nothing new
+    []
+    """
+
+    def __init__(self, state: Optional[Dict[str, Dict[str, Any]]] = None):
+        self._state: Dict[str, Dict[str, Any]] = dict(state or {})
+
+    def poll(self, path: str) -> List[Dict[str, Any]]:
+        """Return the rows appended to ``path`` since the last poll, as dicts keyed by header."""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            logging.warning(f"Tail source missing: {path}")
+            return []
+
+        state = self._state.setdefault(path, {"offset": 0, "inode": st.st_ino, "header": None, "head": ""})
+        with open(path, "rb") as fh:
+            head = bytes.fromhex(state.get("head") or "")
+            if state["inode"] != st.st_ino or st.st_size < state["offset"] or fh.read(len(head)) != head:
+                logging.info(f"Detected rotation of {path}; reading from start "
+                             "(rows appended to the old file since the last poll are not read).")
+                state.update(offset=0, inode=st.st_ino, header=None, head="")
+                head = b""
+            if st.st_size == state["offset"]:
+                return []
+
+            fh.seek(state["offset"])
+            chunk = fh.read(st.st_size - state["offset"])
+            end = chunk.rfind(b"\n")
+            if end < 0:
+                return []  # only a partial line so far
+            complete = chunk[: end + 1]
+            state["offset"] += len(complete)
+
+            if len(head) < _FINGERPRINT_BYTES:  # first bytes already read, the rotation fingerprint
+                fh.seek(0)
+                state["head"] = fh.read(min(_FINGERPRINT_BYTES, state["offset"])).hex()
+
+        lines = complete.decode("utf-8").splitlines()
+        rows = list(csv.reader(lines))
+        if state["header"] is None and rows:
+            state["header"] = rows.pop(0)
+        header = state["header"]
+        return [
+            {k: (None if v.strip() in _NULLS else v) for k, v in zip(header, row)}
+            for row in rows if row
+        ]
+
+    def offset(self, path: str) -> int:
+        return self._state.get(path, {}).get("offset", 0)
+
+    # ---------- Checkpointing ----------
+    def save_state(self, filename: str) -> None:
+        """Persist offsets/headers so a restarted process resumes where it left off."""
+        with open(filename, "w", encoding="utf-8") as fh:
+            json.dump(self._state, fh)
+
+    @classmethod
+    def load_state(cls, filename: str) -> "TailReader":
+        if not os.path.exists(filename):
+            return cls()
+        with open(filename, encoding="utf-8") as fh:
+            return cls(json.load(fh))
+
+
+class LoanAggregates:
+    """Running circulation counters updated one event at a time."""
+
+    def __init__(self):
+        self.issued_by_month = Counter()
+        self.returned_by_month = Counter()
+        self.borrowed_titles = Counter()
+        self.member_activity = Counter()
+        self.open_loans: Dict[str, Dict[str, Any]] = {}
+
+    def on_issue(self, loan: Dict[str, Any]) -> None:
+        self.issued_by_month[loan["borrow_date"].strftime("%Y-%m")] += 1
+        self.borrowed_titles[loan.get("title") or "Unknown Title"] += 1
+        self.member_activity[loan["user_id"]] += 1
+        self.open_loans[loan["issued_id"]] = loan
+
+    def on_return(self, loan: Dict[str, Any]) -> None:
+        self.returned_by_month[loan["return_date"].strftime("%Y-%m")] += 1
+        self.open_loans.pop(loan["issued_id"], None)
+
+    def overdue(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        now = now or datetime.now()
+        return [loan for loan in self.open_loans.values() if loan["due_date"] < now]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "issued_by_month": dict(self.issued_by_month),
+            "returned_by_month": dict(self.returned_by_month),
+            "top_borrowed": self.borrowed_titles.most_common(5),
+            "active_members": len(self.member_activity),
+            "open_loans": len(self.open_loans),
+            "overdue_loans": len(self.overdue()),
+        }
+
+
+class IncrementalIngestor:
+    """
+    Push newly appended issued_status / return_status rows into live state.
+
+    Args:
+        issued_path (str): Path to issued_status.csv.
+        return_path (str): Path to return_status.csv.
+        catalog (list): Optional catalog of book dicts (matched on 'isbn');
+            issues mark the book unavailable and append to its borrow_history.
+        loan_period (int): Days until due, used to derive due dates.
+        member_index: Optional MemberBitmapIndex to record member activity in.
+        tail (TailReader): Reader to use (e.g. one restored with load_state).
+
+    Example
+    -------
+    >>> ing = IncrementalIngestor("data/library_management_system/issued_status.csv",
+    ...                           "data/library_management_system/return_status.csv", catalog=books)
+    >>> ing.poll()          # first call reads everything
+    53
+    >>> ing.poll()          # later calls only read what was appended
+    0
+    """
+
+    def __init__(
+        self,
+        issued_path: str,
+        return_path: str,
+        catalog: Optional[List[Dict[str, Any]]] = None,
+        *,
+        loan_period: int = 14,
+        member_index=None,
+        tail: Optional[TailReader] = None,
+    ):
+        self.issued_path = issued_path
+        self.return_path = return_path
+        self.catalog = catalog if catalog is not None else []
+        self.loan_period = loan_period
+        self.member_index = member_index
+        self.tail = tail or TailReader()
+        self.aggregates = LoanAggregates()
+        self._loans: Dict[str, Dict[str, Any]] = {}
+        self._pending_returns: Dict[str, Dict[str, Any]] = {}
+        self._rejected: List[Dict[str, Any]] = []
+        self._subscribers: List[Callable[[str, Dict[str, Any]], None]] = []
+        self._by_isbn = {b.get("isbn"): b for b in self.catalog}
+
+    def subscribe(self, callback: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Call ``callback(event, loan)`` with event 'issue' or 'return' for every new event."""
+        self._subscribers.append(callback)
+
+    def poll(self) -> int:
+        """
+        Ingest everything appended since the last poll. Returns the number of new rows.
+
+        A row that cannot be applied (e.g. a missing or malformed date) is
+        logged and set aside in ``rejected_rows``; the rows after it are
+        still ingested.
+        """
+        issued = self.tail.poll(self.issued_path)
+        returned = self.tail.poll(self.return_path)
+        for row in issued:
+            self._apply_safely("issue", self._apply_issue, row)
+        for row in returned:
+            self._apply_safely("return", self._apply_return, row)
+        if issued or returned:
+            logging.info(f"Ingested {len(issued)} issue and {len(returned)} return rows.")
+        return len(issued) + len(returned)
+
+    def _apply_safely(self, kind: str, apply: Callable[[Dict[str, Any]], None], row: Dict[str, Any]) -> None:
+        try:
+            apply(row)
+        except Exception as e:
+            self._reject(kind, row, f"{type(e).__name__}: {e}")
+
+    def _reject(self, kind: str, row: Dict[str, Any], reason: str) -> None:
+        logging.warning(f"Skipping {kind} row {row.get('issued_id')!r}: {reason}")
+        self._rejected.append({"kind": kind, "row": row, "reason": reason})
+
+    @staticmethod
+    def _parse_date(value: Any) -> Optional[datetime]:
+        try:
+            return datetime.fromisoformat(value) if value else None
+        except (TypeError, ValueError):
+            return None
+
+    def _apply_issue(self, row: Dict[str, Any]) -> None:
+        issued_id = row.get("issued_id")
+        if not issued_id or issued_id in self._loans:
+            return
+        borrow_date = self._parse_date(row.get("issued_date"))
+        if borrow_date is None:
+            self._reject("issue", row, f"invalid issued_date {row.get('issued_date')!r}")
+            return
+        loan = {
+            "issued_id": issued_id,
+            "user_id": row.get("issued_member_id"),
+            "isbn": row.get("issued_book_isbn"),
+            "title": row.get("issued_book_name"),
+            "emp_id": row.get("issued_emp_id"),
+            "borrow_date": borrow_date,
+            "due_date": borrow_date + timedelta(days=self.loan_period),
+            "return_date": None,
+        }
+        self._loans[issued_id] = loan
+        self.aggregates.on_issue(loan)
+
+        book = self._by_isbn.get(loan["isbn"])
+        if book is None and loan["isbn"]:
+            book = {"isbn": loan["isbn"], "title": loan["title"]}
+            self.catalog.append(book)
+            self._by_isbn[loan["isbn"]] = book
+            bump_catalog_version(self.catalog, "add", book)
+        if book is not None:
+            book["available"] = False
+            book.setdefault("borrow_history", []).append(loan)
+        if self.member_index is not None and loan["user_id"]:
+            self.member_index.record_activity(loan["user_id"], borrow_date)
+        self._notify("issue", loan)
+
+        # A return row can land before its issue row; apply it now.
+        if issued_id in self._pending_returns:
+            self._apply_return(self._pending_returns.pop(issued_id))
+
+    def _apply_return(self, row: Dict[str, Any]) -> None:
+        return_date = self._parse_date(row.get("return_date"))
+        if return_date is None:
+            self._reject("return", row, f"invalid return_date {row.get('return_date')!r}")
+            return
+        loan = self._loans.get(row.get("issued_id"))
+        if loan is None:
+            self._pending_returns[row.get("issued_id")] = row
+            return
+        if loan["return_date"] is not None:
+            return
+        loan["return_date"] = return_date
+        self.aggregates.on_return(loan)
+        book = self._by_isbn.get(loan["isbn"])
+        if book is not None and not any(r["return_date"] is None for r in book.get("borrow_history", [])):
+            book["available"] = True
+        self._notify("return", loan)
+
+    def _notify(self, event: str, loan: Dict[str, Any]) -> None:
+        for callback in self._subscribers:
+            callback(event, loan)
+
+    @property
+    def unmatched_returns(self) -> List[Dict[str, Any]]:
+        """Return rows whose issued_id has not been seen (yet)."""
+        return list(self._pending_returns.values())
+
+    @property
+    def rejected_rows(self) -> List[Dict[str, Any]]:
+        """Rows that could not be applied, as {"kind", "row", "reason"}."""
+        return list(self._rejected)
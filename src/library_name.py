@@ -7,6 +7,9 @@ import logging
 import os
 import csv
 
+from .sketches import HyperLogLog, SpaceSaving
+from .search_cache import bump_catalog_version
+
 
 """""""""""""""" EASY  """""""""""""""
 def setup_logger(logfile="app.log"):
@@ -20,16 +23,49 @@ def setup_logger(logfile="app.log"):
 
 
 """""""""""""""""MEDIUM"""""""""""""""
-def create_report(data):
-    """Generate a simple analytics summary for the dataset."""
-    if data is None or data.empty:
+def create_report(data, approximate=False, precision=12):
+    """
+    Generate a simple analytics summary for the dataset.
+
+    Args:
+        data (DataFrame or iterable): Loan records with 'user_id' / 'title' columns,
+            or an iterable of such chunks, e.g. pd.read_csv(path, chunksize=100_000).
+            Chunks are read one at a time; with approximate=True only the current
+            chunk and two fixed-size sketches are held in memory.
+        approximate (bool): Use HyperLogLog distinct counts instead of exact ones.
+            Unique counts are then within ~1.04 / sqrt(2 ** precision) relative
+            standard error (about 1.6% at the default precision of 12).
+        precision (int): HyperLogLog precision (4..18) when approximate=True.
+    """
+    chunks = [data] if data is None or isinstance(data, pd.DataFrame) else data
+    columns = ("user_id", "title")
+    distinct = {col: HyperLogLog(precision) if approximate else set() for col in columns}
+    present = set()
+    total_records = 0
+
+    for chunk in chunks:
+        if chunk is None or chunk.empty:
+            continue
+        total_records += len(chunk)
+        for col in columns:
+            if col in chunk.columns:
+                present.add(col)
+                # duplicates don't change either count, so hash each value once per chunk
+                distinct[col].update(chunk[col].dropna().drop_duplicates())
+
+    if not total_records:
         logging.warning("No data available for report.")
         return {}
 
+    def _unique(col):
+        if col not in present:
+            return 0
+        return round(distinct[col].count()) if approximate else len(distinct[col])
+
     summary = {
-        "total_records": len(data),
-        "unique_users": data["user_id"].nunique() if "user_id" in data.columns else 0,
-        "unique_titles": data["title"].nunique() if "title" in data.columns else 0
+        "total_records": total_records,
+        "unique_users": _unique("user_id"),
+        "unique_titles": _unique("title")
     }
 
     logging.info("Report created successfully.")
@@ -51,7 +87,27 @@ def load_library_data(filepath):
     except Exception as e:
         logging.exception(f"Error loading data: {e}")
         return None
-    
+
+
+LIBRARY_TABLES = ("books", "branch", "employees", "issued_status", "members", "return_status")
+
+def load_library_tables(data_dir="data/library_management_system"):
+    """
+    Load the six library_management_system CSV tables into DataFrames.
+
+    Args:
+        data_dir (str): Folder containing books.csv, members.csv, etc.
+
+    Returns:
+        dict: Table name -> DataFrame. Missing or unreadable tables are omitted.
+    """
+    tables = {}
+    for name in LIBRARY_TABLES:
+        data = load_library_data(os.path.join(data_dir, f"{name}.csv"))
+        if data is not None:
+            tables[name] = data
+    return tables
+
 
 def validate_input(data):
     """Ensure dataset structure and required columns are valid."""
@@ -103,6 +159,7 @@ def add_new_book(book_data, catalog):
 
     # Add to catalog
     catalog.append(book_data)
+    bump_catalog_version(catalog, "add", book_data)
     print(f"Added new book: {book_data['title']}")
     return catalog
 
@@ -152,21 +209,16 @@ def search_books(query, books_list):
 from datetime import datetime
 from collections import Counter, defaultdict
 
-def generate_monthly_report(catalog, users):
+def _scan_monthly_activity(catalog, now, approximate=False, top_k_capacity=100):
     """
-    Generate a monthly report of borrowing activity, top books, and user engagement.
-
-    Args:
-        catalog (list): List of book dictionaries, each with a 'borrow_history' list.
-        users (list): List of user dictionaries with 'id' and 'name' fields.
+    One pass over every book's borrow_history for the month of ``now``.
 
     Returns:
-        dict: Summary of monthly activity.
+        tuple: (title counts, {user_id: loans this month}, set of overdue titles)
     """
-    now = datetime.now()
-    borrowed = Counter()
+    borrowed = SpaceSaving(top_k_capacity) if approximate else Counter()
     activity = defaultdict(int)
-    overdue = []
+    overdue = set()
 
     # Iterate over all books and their borrow history
     for book in catalog:
@@ -186,14 +238,47 @@ def generate_monthly_report(catalog, users):
 
             # Count only if borrowed this month
             if bd and bd.month == now.month and bd.year == now.year:
-                borrowed[book.get('title', 'Unknown Title')] += 1
+                if approximate:
+                    borrowed.add(book.get('title', 'Unknown Title'))
+                else:
+                    borrowed[book.get('title', 'Unknown Title')] += 1
                 if uid:
                     activity[uid] += 1
 
             # Track overdue (not returned and due date has passed)
             if not rd and dd and dd < now:
-                overdue.append(book.get('title', 'Unknown Title'))
+                overdue.add(book.get('title', 'Unknown Title'))
+
+    return borrowed, activity, overdue
+
+
+def generate_monthly_report(catalog, users, approximate=False, top_k_capacity=100, sink=print):
+    """
+    Generate a monthly report of borrowing activity, top books, and user engagement.
+
+    Args:
+        catalog (list): List of book dictionaries, each with a 'borrow_history' list.
+        users (list): List of user dictionaries with 'id' and 'name' fields.
+        approximate (bool): Track titles with a bounded SpaceSaving summary instead
+            of an exact Counter. Any title borrowed more than
+            borrowed_this_month / top_k_capacity times is guaranteed to be kept,
+            and its count is over-estimated by at most that same amount.
+            Only the title counts are bounded: per-user activity and the
+            active/inactive user lists stay exact and grow with the user base.
+        top_k_capacity (int): Number of title counters kept when approximate=True.
+        sink (callable): Receives each line of the console summary; None to
+            stay silent. For large extracts use export.iter_monthly_report_rows.
+
+    Returns:
+        dict: Summary of monthly activity.
+    """
+    now = datetime.now()
+    borrowed, activity, overdue = _scan_monthly_activity(catalog, now, approximate, top_k_capacity)
+    return _build_monthly_report(now, len(catalog), users, borrowed, activity, overdue, approximate, sink)
+
 
+def _build_monthly_report(now, total_books, users, borrowed, activity, overdue, approximate=False, sink=print):
+    """Assemble (and optionally print) the report from a _scan_monthly_activity result."""
     # Map user IDs to names
     name_map = {u.get('id'): u.get('name') for u in users}
     active = [name_map.get(i, f"User {i}") for i in activity]
@@ -202,24 +287,25 @@ def generate_monthly_report(catalog, users):
     # Build report data
     report = {
         "month": now.strftime("%B %Y"),
-        "total_books": len(catalog),
+        "total_books": total_books,
         "total_users": len(users),
-        "borrowed_this_month": sum(borrowed.values()),
+        "borrowed_this_month": borrowed.total if approximate else sum(borrowed.values()),
         "top_borrowed": borrowed.most_common(5),
-        "overdue_books": list(set(overdue)),
+        "overdue_books": list(overdue),
         "active_users": active,
         "inactive_users": inactive
     }
 
     # Print summary
-    print(f"\n=== Monthly Report: {report['month']} ===")
-    print(f"Total Books: {report['total_books']}")
-    print(f"Total Users: {report['total_users']}")
-    print(f"Borrowed This Month: {report['borrowed_this_month']}")
-    print("Top Borrowed:", report['top_borrowed'])
-    print("Overdue Books:", report['overdue_books'])
-    print("Active Users:", report['active_users'])
-    print("Inactive Users:", report['inactive_users'])
+    if sink is not None:
+        sink(f"\n=== Monthly Report: {report['month']} ===")
+        sink(f"Total Books: {report['total_books']}")
+        sink(f"Total Users: {report['total_users']}")
+        sink(f"Borrowed This Month: {report['borrowed_this_month']}")
+        sink(f"Top Borrowed: {report['top_borrowed']}")
+        sink(f"Overdue Books: {report['overdue_books']}")
+        sink(f"Active Users: {report['active_users']}")
+        sink(f"Inactive Users: {report['inactive_users']}")
 
     return report
 
@@ -260,6 +346,7 @@ def import_books_from_csv(filename, catalog):
 
                 # Add to catalog
                 catalog.append(book)
+                bump_catalog_version(catalog, "add", book)
         print(f"Imported {len(catalog)} books successfully.")
     except FileNotFoundError:
         print(f"File '{filename}' not found.")
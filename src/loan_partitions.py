@@ -0,0 +1,201 @@
+"""
+loan_partitions.py — Month-partitioned storage of loan history.
+
+Issue events are partitioned by issued_date month and return events by
+return_date month, both in memory and (optionally) on disk:
+
+    <root>/issue/2024-03.csv
+    <root>/return/2024-05.csv
+    <root>/_metadata.json      # per partition: rows, min_date, max_date
+
+Date-range queries consult the metadata first and only load partitions whose
+[min_date, max_date] overlaps the range, so cost tracks the queried window
+rather than the whole history.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+DATE_COLUMN = {"issue": "issued_date", "return": "return_date"}
+
+
+class PartitionedLoanStore:
+    """
+    Loan history split into per-month partitions with min/max metadata.
+
+    Attributes
+    ----------
+    root : str or None
+        Directory for the on-disk copy; None keeps everything in memory.
+    metadata : dict
+        {"issue": {month: {"rows", "min_date", "max_date"}}, "return": {...}}
+
+    Example
+    -------
+    >>> store = PartitionedLoanStore.from_tables(tables, root="data/loan_partitions")
+    >>> store.scan("2024-04-01", "2024-04-30")["issued_id"].tolist()[:2]
+    ['IS128', 'IS129']
+    >>> store.last_scan_partitions
+    ['issue/2024-04']
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root
+        self.metadata: Dict[str, Dict[str, Dict[str, Any]]] = {"issue": {}, "return": {}}
+        self._partitions: Dict[str, Dict[str, pd.DataFrame]] = {"issue": {}, "return": {}}
+        self.last_scan_partitions: List[str] = []
+        if root is not None:
+            os.makedirs(os.path.join(root, "issue"), exist_ok=True)
+            os.makedirs(os.path.join(root, "return"), exist_ok=True)
+
+    # ---------- Construction ----------
+    @classmethod
+    def from_tables(cls, tables: Dict[str, pd.DataFrame], root: Optional[str] = None) -> "PartitionedLoanStore":
+        """
+        Partition issued_status / return_status (e.g. from load_library_tables()).
+
+        ``root`` should be a new/empty directory; use open() + append() to add
+        to an existing store.
+        """
+        store = cls(root)
+        if "issued_status" in tables:
+            store.append("issue", tables["issued_status"])
+        if "return_status" in tables:
+            store.append("return", tables["return_status"])
+        return store
+
+    @classmethod
+    def open(cls, root: str) -> "PartitionedLoanStore":
+        """Open an on-disk store; only metadata is read until partitions are queried."""
+        store = cls(root)
+        path = os.path.join(root, "_metadata.json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                store.metadata = json.load(fh)
+        return store
+
+    # ---------- Writes ----------
+    def append(self, kind: str, rows: pd.DataFrame) -> int:
+        """
+        Add issue or return rows, routing each to its month partition.
+
+        Args:
+            kind (str): "issue" (issued_status rows) or "return" (return_status rows).
+            rows (DataFrame): Rows in the dataset's column layout.
+
+        Returns:
+            int: Rows stored (rows with unparseable dates are skipped).
+        """
+        col = DATE_COLUMN[kind]
+        dates = pd.to_datetime(rows[col], errors="coerce")
+        bad = int(dates.isna().sum())
+        if bad:
+            logging.warning(f"Skipping {bad} {kind} rows with no valid {col}.")
+        rows = rows.loc[dates.notna()]
+        dates = dates.dropna()
+        stored = 0
+        for month, part in rows.groupby(dates.dt.strftime("%Y-%m")):
+            part_dates = dates.loc[part.index]
+            self._add_partition_rows(kind, month, part, part_dates.min(), part_dates.max())
+            stored += len(part)
+        self._save_metadata()
+        return stored
+
+    def _add_partition_rows(self, kind, month, part, lo, hi) -> None:
+        meta = self.metadata[kind].get(month)
+        if meta is None:
+            meta = self.metadata[kind][month] = {"rows": 0, "min_date": lo.strftime("%Y-%m-%d"),
+                                                 "max_date": hi.strftime("%Y-%m-%d")}
+        meta["rows"] += len(part)
+        meta["min_date"] = min(meta["min_date"], lo.strftime("%Y-%m-%d"))
+        meta["max_date"] = max(meta["max_date"], hi.strftime("%Y-%m-%d"))
+
+        cached = self._partitions[kind].get(month)
+        if cached is not None:
+            self._partitions[kind][month] = pd.concat([cached, part], ignore_index=True)
+        elif self.root is None:
+            self._partitions[kind][month] = part.reset_index(drop=True)
+
+        if self.root is not None:
+            path = self._path(kind, month)
+            part.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+    def _path(self, kind: str, month: str) -> str:
+        return os.path.join(self.root, kind, f"{month}.csv")
+
+    def _save_metadata(self) -> None:
+        if self.root is None:
+            return
+        with open(os.path.join(self.root, "_metadata.json"), "w", encoding="utf-8") as fh:
+            json.dump(self.metadata, fh, indent=2, sort_keys=True)
+
+    # ---------- Reads ----------
+    def partitions_for(self, start=None, end=None, kind: str = "issue") -> List[str]:
+        """Months whose [min_date, max_date] overlaps [start, end] (inclusive)."""
+        lo = pd.Timestamp(start).strftime("%Y-%m-%d") if start is not None else None
+        hi = pd.Timestamp(end).strftime("%Y-%m-%d") if end is not None else None
+        return sorted(
+            month for month, meta in self.metadata[kind].items()
+            if (lo is None or meta["max_date"] >= lo) and (hi is None or meta["min_date"] <= hi)
+        )
+
+    def partition(self, month: str, kind: str = "issue") -> pd.DataFrame:
+        """Load one partition (cached after the first read from disk)."""
+        part = self._partitions[kind].get(month)
+        if part is None:
+            if self.root is None or not os.path.exists(self._path(kind, month)):
+                return pd.DataFrame()
+            part = self._partitions[kind][month] = pd.read_csv(self._path(kind, month))
+        return part
+
+    def scan(self, start=None, end=None, kind: str = "issue") -> pd.DataFrame:
+        """
+        Rows of ``kind`` dated within [start, end], reading only overlapping partitions.
+
+        The partitions actually read are left in ``last_scan_partitions`` as
+        "<kind>/<month>", matching the on-disk layout.
+        """
+        months = self.partitions_for(start, end, kind)
+        self.last_scan_partitions = [f"{kind}/{m}" for m in months]
+        if not months:
+            return pd.DataFrame()
+        rows = pd.concat([self.partition(m, kind) for m in months], ignore_index=True)
+        dates = pd.to_datetime(rows[DATE_COLUMN[kind]], errors="coerce")
+        mask = pd.Series(True, index=rows.index)
+        if start is not None:
+            mask &= dates >= pd.Timestamp(start)
+        if end is not None:
+            mask &= dates <= pd.Timestamp(end)
+        return rows.loc[mask].reset_index(drop=True)
+
+    def monthly_activity(self, month: str) -> Dict[str, Any]:
+        """
+        Circulation summary for one month, touching only that month's partitions.
+
+        ``last_scan_partitions`` lists the issue and return partitions read.
+        """
+        start = pd.Timestamp(f"{month}-01")
+        end = start + pd.offsets.MonthEnd(0)
+        issues = self.scan(start, end, "issue")
+        read = self.last_scan_partitions
+        returns = self.scan(start, end, "return")
+        self.last_scan_partitions = read + self.last_scan_partitions
+        top = issues["issued_book_name"].value_counts().head(5) if not issues.empty else pd.Series(dtype=int)
+        return {
+            "month": start.strftime("%B %Y"),
+            "borrowed": len(issues),
+            "returned": len(returns),
+            "active_members": int(issues["issued_member_id"].nunique()) if not issues.empty else 0,
+            "top_borrowed": list(top.items()),
+        }
+
+    def total_rows(self, kind: str = "issue") -> int:
+        return sum(meta["rows"] for meta in self.metadata[kind].values())
+
+    def __repr__(self):
+        return (f"PartitionedLoanStore(issue_partitions={len(self.metadata['issue'])}, "
+                f"return_partitions={len(self.metadata['return'])}, root={self.root!r})")
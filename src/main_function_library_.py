@@ -6,6 +6,11 @@ import pandas as pd
 import logging
 import os
 
+from .sketches import HyperLogLog
+from .search_cache import SearchCache, bump_catalog_version
+from .fines import to_cents
+from .similarity import similarity_scores
+
 
 """""""""""""""" EASY  """""""""""""""
 def setup_logger(logfile="app.log"):
@@ -53,16 +58,49 @@ def is_available(book_id, catalog):
 """""""""""""""""MEDIUM"""""""""""""""
 
 # Create Report
-def create_report(data):
-    """Generate a simple analytics summary for the dataset."""
-    if data is None or data.empty:
+def create_report(data, approximate=False, precision=12):
+    """
+    Generate a simple analytics summary for the dataset.
+
+    Args:
+        data (DataFrame or iterable): Loan records with 'user_id' / 'title' columns,
+            or an iterable of such chunks, e.g. pd.read_csv(path, chunksize=100_000).
+            Chunks are read one at a time; with approximate=True only the current
+            chunk and two fixed-size sketches are held in memory.
+        approximate (bool): Use HyperLogLog distinct counts instead of exact ones.
+            Unique counts are then within ~1.04 / sqrt(2 ** precision) relative
+            standard error (about 1.6% at the default precision of 12).
+        precision (int): HyperLogLog precision (4..18) when approximate=True.
+    """
+    chunks = [data] if data is None or isinstance(data, pd.DataFrame) else data
+    columns = ("user_id", "title")
+    distinct = {col: HyperLogLog(precision) if approximate else set() for col in columns}
+    present = set()
+    total_records = 0
+
+    for chunk in chunks:
+        if chunk is None or chunk.empty:
+            continue
+        total_records += len(chunk)
+        for col in columns:
+            if col in chunk.columns:
+                present.add(col)
+                # duplicates don't change either count, so hash each value once per chunk
+                distinct[col].update(chunk[col].dropna().drop_duplicates())
+
+    if not total_records:
         logging.warning("No data available for report.")
         return {}
 
+    def _unique(col):
+        if col not in present:
+            return 0
+        return round(distinct[col].count()) if approximate else len(distinct[col])
+
     summary = {
-        "total_records": len(data),
-        "unique_users": data["user_id"].nunique() if "user_id" in data.columns else 0,
-        "unique_titles": data["title"].nunique() if "title" in data.columns else 0
+        "total_records": total_records,
+        "unique_users": _unique("user_id"),
+        "unique_titles": _unique("title")
     }
 
     logging.info("Report created successfully.")
@@ -135,6 +173,7 @@ def add_new_book(book_data, catalog):
 
     # Add to catalog
     catalog.append(book_data)
+    bump_catalog_version(catalog, "add", book_data)
     print(f"Added new book: {book_data['title']}")
     return catalog
 
@@ -236,7 +275,7 @@ def return_book(user_id, book_id, catalog, users, daily_rate=0.25):
     due_date = record["due_date"]
     return_date = datetime.now()
     days_late = max(0, (return_date - due_date).days)
-    fee = days_late * daily_rate
+    fee = days_late * to_cents(daily_rate) / 100  # exact cents product; still returned in dollars
 
     # 5. Update book availability
     book["available"] = True
@@ -280,6 +319,7 @@ def remove_book(book_id, catalog, permanent=False):
         return False, f"Cannot remove '{book['title']}' because it is currently borrowed."
 
     # Handle permanent or soft deletion
+    bump_catalog_version(catalog, "remove", book)
     if permanent:
         catalog.remove(book)
         return True, f"Book '{book['title']}' permanently removed from catalog."
@@ -296,7 +336,6 @@ def remove_book(book_id, catalog, permanent=False):
 #search books
 from typing import List, Dict, Any, Optional, Tuple
 import unicodedata
-import difflib
 
 def _normalize_text(s: str) -> str:
     if s is None:
@@ -317,11 +356,17 @@ def search_books(
     min_ratio: float = 0.65,     # 0..1 similarity threshold when fuzzy=True
     limit: Optional[int] = 25,   # max results
     page: int = 1,               # 1-based page index
-    page_size: Optional[int] = None  # overrides 'limit' with paged results if set
+    page_size: Optional[int] = None,  # overrides 'limit' with paged results if set
+    cache: Optional[SearchCache] = None,  # reuse ranked lists for repeated queries
+    similarity: str = "bitparallel"  # fuzzy backend; "difflib" for the legacy scores (see similarity.py)
 ) -> Dict[str, Any]:
     """
     Weighted, robust search across title/author/ISBN with optional fuzzy matching.
 
+    With a SearchCache, the full ranked list is cached per normalized query and
+    ranking options; limit/page/page_size are applied on top of it. Entries are
+    invalidated when the catalog version changes (add_new_book, remove_book, ...).
+
     Returns:
         {
           "total": int,
@@ -334,17 +379,68 @@ def search_books(
         return {"total": 0, "results": [], "page": 1, "page_size": page_size}
 
     qnorm = _normalize_text(query)
-    qtokens = set(_tokenize(query))
+
+    if cache is not None:
+        key = cache.make_key(books_list, qnorm, fields=tuple(fields), fuzzy=fuzzy, min_ratio=min_ratio,
+                             similarity=similarity)
+        all_results = cache.get(key, books_list)
+        if all_results is None:
+            all_results = _rank_books(qnorm, books_list, fields, fuzzy, min_ratio, similarity)
+            cache.put(key, books_list, all_results)
+    else:
+        all_results = _rank_books(qnorm, books_list, fields, fuzzy, min_ratio, similarity)
+
+    # Pagination logic
+    if page_size is not None and page_size > 0:
+        start = (max(page, 1) - 1) * page_size
+        end = start + page_size
+        page_results = all_results[start:end]
+        return {"total": len(all_results), "results": page_results, "page": max(page, 1), "page_size": page_size}
+
+    # Legacy limit behavior
+    total = len(all_results)
+    if limit is not None and limit > 0:
+        all_results = all_results[:limit]
+    else:
+        all_results = list(all_results)  # never hand out the cached list itself
+
+    return {"total": total, "results": all_results, "page": 1, "page_size": None}
+
+
+def _rank_books(
+    qnorm: str,
+    books_list: List[Dict[str, Any]],
+    fields: Tuple[str, ...],
+    fuzzy: bool,
+    min_ratio: float,
+    similarity: str = "bitparallel",
+    with_scores: bool = False,
+) -> List[Any]:
+    """
+    Score every book against a normalized query; return matches best-first.
+
+    With with_scores=True, (score, book) pairs are returned instead of books,
+    so ranked lists from several catalog shards can be merged.
+    """
+    qtokens = set(_tokenize(qnorm))
 
     # Weights: tune to preference
     weights = {"title": 1.0, "author": 0.7, "isbn": 0.9}
 
+    # Normalize each field once, then score all fuzzy fields in one batch per field
+    values = {f: [_normalize_text(b.get(f, "")) for b in books_list] for f in fields}
+    ratios = {}
+    if fuzzy:
+        for f in fields:
+            if f in ("title", "author"):
+                ratios[f] = similarity_scores(qnorm, values[f], similarity)
+
     scored: List[Tuple[float, Dict[str, Any]]] = []
 
-    for book in books_list:
+    for i, book in enumerate(books_list):
         score = 0.0
         for f in fields:
-            val = _normalize_text(book.get(f, ""))
+            val = values[f][i]
             if not val:
                 continue
 
@@ -360,8 +456,8 @@ def search_books(
                     score += weights.get(f, 0.5) * min(0.75, 0.15 * overlap)
 
             # Fuzzy matching (title/author mostly)
-            if fuzzy and f in ("title", "author"):
-                ratio = difflib.SequenceMatcher(None, qnorm, val).ratio()
+            if f in ratios:
+                ratio = ratios[f][i]
                 if ratio >= min_ratio:
                     # taper influence so near-perfect matches bubble up
                     score += weights.get(f, 0.5) * (ratio ** 2)
@@ -369,19 +465,10 @@ def search_books(
         if score > 0:
             scored.append((score, book))
 
-    # sort by score desc, then title asc to stabilize order
-    scored.sort(key=lambda x: (-x[0], _normalize_text(x[1].get("title", ""))))
-    all_results = [b for _, b in scored]
+    scored.sort(key=_rank_key)
+    return scored if with_scores else [b for _, b in scored]
 
-    # Pagination logic
-    if page_size is not None and page_size > 0:
-        start = (max(page, 1) - 1) * page_size
-        end = start + page_size
-        page_results = all_results[start:end]
-        return {"total": len(all_results), "results": page_results, "page": max(page, 1), "page_size": page_size}
-
-    # Legacy limit behavior
-    if limit is not None and limit > 0:
-        all_results = all_results[:limit]
 
-    return {"total": len(scored), "results": all_results, "page": 1, "page_size": None}
+def _rank_key(item: Tuple[float, Dict[str, Any]]) -> Tuple[float, str]:
+    """Sort key for (score, book): score desc, then title asc to stabilize order."""
+    return -item[0], _normalize_text(item[1].get("title", ""))
@@ -0,0 +1,238 @@
+"""
+member_bitmaps.py — Per-month member bitmaps for engagement and cohort analytics.
+
+Every member gets an integer ordinal, and every month keeps a packed NumPy bit
+array with one bit per member (overall and per branch). Active, retained,
+churned and new-cohort counts over any month range are then a handful of
+vectorized OR/AND operations plus a popcount, with no rescan of the loans.
+"""
+
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+Month = Union[str, date, datetime, pd.Timestamp]
+
+
+def month_key(value: Month) -> int:
+    """Convert a date or 'YYYY-MM[-DD]' string to a month ordinal (year * 12 + month - 1)."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value if len(value) > 7 else f"{value}-01")
+    return value.year * 12 + value.month - 1
+
+
+def month_label(key: int) -> str:
+    """Inverse of month_key: 24291 -> '2024-04'."""
+    return f"{key // 12:04d}-{key % 12 + 1:02d}"
+
+
+class MemberBitmapIndex:
+    """
+    Compact per-month member bitmaps keyed by an integer member ordinal.
+
+    Attributes
+    ----------
+    member_ids : list
+        Member ids in ordinal order (bit ``i`` refers to ``member_ids[i]``).
+
+    Example
+    -------
+    >>> idx = MemberBitmapIndex.from_tables(tables["members"], tables["issued_status"], tables["employees"])
+    >>> idx.active_count("2024-03", "2024-04")
+    10
+    >>> idx.count(idx.churned(("2024-03", "2024-03"), ("2024-04", "2024-04")))
+    2
+    """
+
+    def __init__(self, member_ids: Iterable[Any] = ()):
+        self.member_ids: List[Any] = []
+        self._ordinal: Dict[Any, int] = {}
+        self._active: Dict[Tuple[int, Optional[str]], np.ndarray] = {}
+        self._cohorts: Dict[int, np.ndarray] = {}
+        for mid in member_ids:
+            self.add_member(mid)
+
+    # ---------- Construction ----------
+    @classmethod
+    def from_tables(
+        cls,
+        members: pd.DataFrame,
+        issued_status: Optional[pd.DataFrame] = None,
+        employees: Optional[pd.DataFrame] = None,
+    ) -> "MemberBitmapIndex":
+        """
+        Build the index from the members / issued_status / employees tables.
+
+        Registration months come from ``members.reg_date``; activity comes from
+        ``issued_status`` and is attributed to a branch through
+        ``issued_emp_id -> employees.branch_id`` when employees are given.
+        """
+        index = cls(members["member_id"].tolist())
+        reg = pd.to_datetime(members["reg_date"], errors="coerce")
+        index._set_bits(index._cohorts, members["member_id"], reg, None)
+
+        if issued_status is not None and not issued_status.empty:
+            issued = issued_status
+            for mid in issued["issued_member_id"].dropna().unique():
+                index.add_member(mid)
+            when = pd.to_datetime(issued["issued_date"], errors="coerce")
+            index._set_bits(index._active, issued["issued_member_id"], when, None)
+            if employees is not None and "issued_emp_id" in issued.columns:
+                branch = issued["issued_emp_id"].map(employees.set_index("emp_id")["branch_id"])
+                for bid in branch.dropna().unique():
+                    mask = (branch == bid).to_numpy()
+                    index._set_bits(index._active, issued["issued_member_id"][mask], when[mask], bid)
+
+        logging.info(f"Member bitmap index built for {len(index.member_ids)} members.")
+        return index
+
+    @classmethod
+    def from_borrow_history(cls, catalog: List[Dict[str, Any]], users: List[Dict[str, Any]]) -> "MemberBitmapIndex":
+        """Build the index from in-memory catalog ``borrow_history`` records and user dicts."""
+        index = cls(u.get("id") for u in users)
+        for user in users:
+            if user.get("reg_date"):
+                index.record_registration(user["id"], user["reg_date"])
+        for book in catalog:
+            for rec in book.get("borrow_history", []):
+                if rec.get("user_id") is not None and rec.get("borrow_date"):
+                    index.record_activity(rec["user_id"], rec["borrow_date"], book.get("branch_id"))
+        return index
+
+    def _set_bits(self, target, ids: pd.Series, when: pd.Series, branch: Optional[str]) -> None:
+        """Vectorized bulk insert of (member, month) pairs into ``target``."""
+        frame = pd.DataFrame({"ord": ids.map(self._ordinal).to_numpy(), "when": when.to_numpy()}).dropna()
+        if frame.empty:
+            return
+        months = frame["when"].dt.year * 12 + frame["when"].dt.month - 1
+        for key, ords in frame["ord"].astype(np.int64).groupby(months.to_numpy()):
+            bits = np.zeros(len(self.member_ids), dtype=bool)
+            bits[ords.to_numpy()] = True
+            slot = int(key) if target is self._cohorts else (int(key), branch)
+            target[slot] = self._get(target, slot) | np.packbits(bits, bitorder="little")
+
+    # ---------- Incremental updates ----------
+    def add_member(self, member_id: Any) -> int:
+        """Return the ordinal of ``member_id``, assigning the next free one if new."""
+        if member_id not in self._ordinal:
+            self._ordinal[member_id] = len(self.member_ids)
+            self.member_ids.append(member_id)
+        return self._ordinal[member_id]
+
+    def record_registration(self, member_id: Any, reg_date: Month) -> None:
+        """Add ``member_id`` to the cohort of the month it registered in."""
+        self._set_bit(self._cohorts, month_key(reg_date), self.add_member(member_id))
+
+    def record_activity(self, member_id: Any, when: Month, branch: Optional[str] = None) -> None:
+        """Mark ``member_id`` active in the month of ``when`` (and at ``branch`` if given)."""
+        o = self.add_member(member_id)
+        key = month_key(when)
+        self._set_bit(self._active, (key, None), o)
+        if branch is not None:
+            self._set_bit(self._active, (key, branch), o)
+
+    def _set_bit(self, target, slot, o: int) -> None:
+        bits = self._get(target, slot)
+        bits[o >> 3] |= np.uint8(1 << (o & 7))
+        target[slot] = bits
+
+    def _get(self, target, slot) -> np.ndarray:
+        """Fetch a bitmap, zero-extended to the current member count."""
+        nbytes = (len(self.member_ids) + 7) // 8
+        bits = target.get(slot)
+        if bits is None:
+            return np.zeros(nbytes, dtype=np.uint8)
+        if len(bits) < nbytes:
+            bits = np.concatenate([bits, np.zeros(nbytes - len(bits), dtype=np.uint8)])
+        return bits
+
+    # ---------- Set queries ----------
+    def _union(self, target, start: Month, end: Optional[Month], branch: Optional[str] = None) -> np.ndarray:
+        lo = month_key(start)
+        hi = month_key(end) if end is not None else lo
+        out = self._get(target, None)
+        for key in range(lo, hi + 1):
+            slot = key if target is self._cohorts else (key, branch)
+            if slot in target:
+                out |= self._get(target, slot)
+        return out
+
+    def all_members(self) -> np.ndarray:
+        """Bitmap with every known member set."""
+        n = len(self.member_ids)
+        return np.packbits(np.ones(n, dtype=bool), bitorder="little") if n else np.zeros(0, dtype=np.uint8)
+
+    def active(self, start: Month, end: Optional[Month] = None, branch: Optional[str] = None) -> np.ndarray:
+        """Members with at least one loan in the month range [start, end], optionally at one branch."""
+        return self._union(self._active, start, end, branch)
+
+    def new_members(self, start: Month, end: Optional[Month] = None) -> np.ndarray:
+        """Members whose ``reg_date`` falls in [start, end]."""
+        return self._union(self._cohorts, start, end)
+
+    def retained(self, previous: Tuple[Month, Month], current: Tuple[Month, Month], branch: Optional[str] = None) -> np.ndarray:
+        """Members active in both the previous and the current range."""
+        return self.active(*previous, branch=branch) & self.active(*current, branch=branch)
+
+    def churned(self, previous: Tuple[Month, Month], current: Tuple[Month, Month], branch: Optional[str] = None) -> np.ndarray:
+        """Members active in the previous range but not in the current one."""
+        return self.active(*previous, branch=branch) & ~self.active(*current, branch=branch)
+
+    def inactive(self, start: Month, end: Optional[Month] = None, branch: Optional[str] = None) -> np.ndarray:
+        """Known members with no loans in [start, end]."""
+        return self.all_members() & ~self.active(start, end, branch)
+
+    # ---------- Decoding ----------
+    @staticmethod
+    def count(bitmap: np.ndarray) -> int:
+        """Population count of a packed bitmap."""
+        return int(np.bitwise_count(bitmap).sum())
+
+    def active_count(self, start: Month, end: Optional[Month] = None, branch: Optional[str] = None) -> int:
+        """Distinct active members in [start, end]."""
+        return self.count(self.active(start, end, branch))
+
+    def members(self, bitmap: np.ndarray) -> List[Any]:
+        """Decode a bitmap back to member ids."""
+        bits = np.unpackbits(bitmap, bitorder="little", count=len(self.member_ids))
+        return [self.member_ids[i] for i in np.flatnonzero(bits)]
+
+    def growth_trend(self, start: Month, end: Month, branch: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Month-by-month membership growth and engagement.
+
+        Returns:
+            list: One dict per month with new, total (cumulative registered),
+            active, retained (also active the month before) and churned counts.
+        """
+        lo, hi = month_key(start), month_key(end)
+        registered = self._get(self._cohorts, None)
+        for key in [k for k in self._cohorts if k < lo]:
+            registered |= self._get(self._cohorts, key)
+        prev = self._get(self._active, (lo - 1, branch))
+
+        rows = []
+        for key in range(lo, hi + 1):
+            label = month_label(key)
+            new = self.new_members(label)
+            registered |= new
+            cur = self.active(label, branch=branch)
+            rows.append({
+                "month": label,
+                "new": self.count(new),
+                "total": self.count(registered),
+                "active": self.count(cur),
+                "retained": self.count(prev & cur),
+                "churned": self.count(prev & ~cur),
+            })
+            prev = cur
+        return rows
+
+    def __len__(self):
+        return len(self.member_ids)
+
+    def __repr__(self):
+        return f"MemberBitmapIndex(members={len(self.member_ids)}, periods={len({k for k, _ in self._active})})"
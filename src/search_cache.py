@@ -0,0 +1,127 @@
+"""
+search_cache.py — Versioned LRU cache for search results.
+
+Catalogs are plain lists of book dicts, so every function that mutates one
+(add_new_book, remove_book, import_books_from_csv, ...) bumps a per-catalog
+version counter via bump_catalog_version(). Cached ranked result lists are
+stored with the version they were computed at, and a version mismatch counts
+as a miss, so stale results are never served.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+_CATALOG_VERSIONS: Dict[int, int] = {}
+_CATALOG_WATCHERS: Dict[int, List[Callable[[Optional[str], Optional[Dict[str, Any]]], None]]] = {}
+
+
+def catalog_version(catalog: List[Dict[str, Any]]) -> int:
+    """Current version number of ``catalog`` (0 until first modified)."""
+    return _CATALOG_VERSIONS.get(id(catalog), 0)
+
+
+def bump_catalog_version(
+    catalog: List[Dict[str, Any]],
+    event: Optional[str] = None,
+    book: Optional[Dict[str, Any]] = None,
+) -> int:
+    """
+    Record that ``catalog`` changed; invalidates cached searches over it.
+
+    ``event`` ("add" / "remove", or None for "anything may have changed") and
+    the affected ``book`` are forwarded to callbacks registered with
+    watch_catalog(), so derived indexes can update incrementally.
+    """
+    version = _CATALOG_VERSIONS.get(id(catalog), 0) + 1
+    _CATALOG_VERSIONS[id(catalog)] = version
+    for callback in _CATALOG_WATCHERS.get(id(catalog), ()):
+        callback(event, book)
+    return version
+
+
+def watch_catalog(catalog: List[Dict[str, Any]], callback: Callable) -> None:
+    """Call ``callback(event, book)`` whenever ``catalog`` is modified."""
+    _CATALOG_WATCHERS.setdefault(id(catalog), []).append(callback)
+
+
+def unwatch_catalog(catalog: List[Dict[str, Any]], callback: Callable) -> None:
+    watchers = _CATALOG_WATCHERS.get(id(catalog), [])
+    if callback in watchers:
+        watchers.remove(callback)
+    if not watchers:
+        _CATALOG_WATCHERS.pop(id(catalog), None)
+
+
+class SearchCache:
+    """
+    Bounded LRU cache of full ranked result lists.
+
+    Entries are keyed on the catalog plus the normalized query and the options
+    that change ranking (fields, fuzzy, min_ratio). Paging/limit are applied on
+    top of the cached ranked list, so page 2 of a query is served from the same
+    entry as page 1.
+
+    Example
+    -------
+    >>> cache = SearchCache(maxsize=128)
+    >>> search_books("dune", books, cache=cache)["total"]
+    1
+    >>> search_books("dune", books, cache=cache, page=2, page_size=10)["total"]  # hit
+    1
+    >>> cache.stats()["hits"]
+    1
+    """
+
+    def __init__(self, maxsize: int = 256):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        # key -> (version, catalog, ranked). Holding the catalog keeps it alive,
+        # so its id() cannot be reused by another list while the entry exists.
+        self._entries: "OrderedDict[Hashable, Tuple[int, Any, List[Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(catalog: Any, qnorm: str, **options: Any) -> Hashable:
+        """Build a cache key from the catalog, a normalized query and ranking options."""
+        return (id(catalog), qnorm, tuple(sorted(options.items())))
+
+    def get(self, key: Hashable, catalog: Any, version: Optional[int] = None) -> Optional[List[Any]]:
+        """Return the cached ranked list for ``key`` or None on a miss / stale entry."""
+        version = catalog_version(catalog) if version is None else version
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version or entry[1] is not catalog:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def put(self, key: Hashable, catalog: Any, ranked: List[Any], version: Optional[int] = None) -> None:
+        version = catalog_version(catalog) if version is None else version
+        self._entries[key] = (version, catalog, ranked)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __len__(self):
+        return len(self._entries)
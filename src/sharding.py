@@ -0,0 +1,409 @@
+"""
+sharding.py — Branch-sharded circulation across worker processes.
+
+Every book belongs to one branch (book["branch_id"]). ShardedLibrary starts
+one worker per branch; each worker owns that branch's slice of the catalog
+and a replica of the user list, and runs the ordinary list-of-dicts
+functions (checkout_book, return_book, search_books, ...) on it. The router
+in the parent process keeps only a book_id -> branch map:
+
+    checkout / return / get_book      -> owning shard only
+    search_books / monthly_report     -> scatter to all shards, merge results
+
+Workers talk over multiprocessing Connections, so a shard can also run on
+another host with serve_shard() and be attached through ``remote=``. Those
+connections unpickle whatever the peer sends, so a remote shard must use a
+secret authkey (os.urandom(32), shared out of band) on a trusted network.
+
+    with ShardedLibrary(catalog, users, tables=load_library_tables()) as lib:
+        lib.checkout_book("C101", 7)
+        lib.search_books("gatsby")
+"""
+
+import heapq
+import logging
+import multiprocessing as mp
+import zlib
+from collections import Counter, defaultdict
+from datetime import datetime
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .library_name import _build_monthly_report, _scan_monthly_activity
+from .main_function_library_ import (
+    _normalize_text,
+    _rank_books,
+    _rank_key,
+    add_new_book,
+    checkout_book,
+    return_book,
+)
+from .search_cache import SearchCache
+from .sketches import SpaceSaving
+
+
+# ---------- Branch assignment ----------
+def assign_branches(catalog: List[Dict[str, Any]], tables: Optional[Dict[str, Any]] = None,
+                    branches: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """
+    Set book["branch_id"] on every book that lacks one.
+
+    A book goes to the branch of the employee who last issued its ISBN
+    (issued_status -> employees.branch_id). Books with no issue record are
+    spread over ``branches`` (default: branch.csv ids) by a stable hash of
+    their id.
+
+    Args:
+        catalog (list): Book dictionaries (updated in place).
+        tables (dict): Dataset tables from load_library_tables(), optional.
+        branches (iterable): Branch ids for books with no issue history.
+
+    Returns:
+        dict: Number of books per branch.
+    """
+    by_isbn: Dict[str, str] = {}
+    if tables and {"issued_status", "employees"} <= set(tables):
+        emp_branch = tables["employees"].set_index("emp_id")["branch_id"]
+        issued = tables["issued_status"].sort_values("issued_date")
+        branch = issued["issued_emp_id"].map(emp_branch)
+        for isbn, b in zip(issued["issued_book_isbn"], branch):
+            if isinstance(b, str):
+                by_isbn[str(isbn)] = b
+    if branches is None:
+        branches = tables["branch"]["branch_id"].tolist() if tables and "branch" in tables else ["B001"]
+    branches = sorted(branches)
+
+    for book in catalog:
+        if book.get("branch_id"):
+            continue
+        book["branch_id"] = by_isbn.get(str(book.get("isbn"))) or \
+            branches[zlib.crc32(str(book.get("id")).encode()) % len(branches)]
+    return dict(Counter(b["branch_id"] for b in catalog))
+
+
+# ---------- Shard worker ----------
+class _Shard:
+    """State and operations of one branch shard (runs inside the worker)."""
+
+    def __init__(self, branch_id: str, catalog: List[Dict[str, Any]], users: List[Dict[str, Any]]):
+        self.branch_id = branch_id
+        self.catalog = catalog
+        self.users = users
+        self.cache = SearchCache()
+
+    def book_ids(self):
+        return [b.get("id") for b in self.catalog]
+
+    def checkout(self, user_id, book_id, loan_period=14):
+        return checkout_book(user_id, book_id, self.catalog, self.users, loan_period)
+
+    def return_(self, user_id, book_id, daily_rate=0.25):
+        return return_book(user_id, book_id, self.catalog, self.users, daily_rate)
+
+    def get_book(self, book_id):
+        return next((b for b in self.catalog if b.get("id") == book_id), None)
+
+    def add_book(self, book_data):
+        before = len(self.catalog)
+        add_new_book({**book_data, "branch_id": self.branch_id}, self.catalog)
+        return len(self.catalog) > before
+
+    def add_user(self, user):
+        if not any(u.get("id") == user.get("id") for u in self.users):
+            self.users.append(user)
+
+    def user_loans(self, user_id):
+        user = next((u for u in self.users if u.get("id") == user_id), None)
+        return [{**r, "branch_id": self.branch_id} for r in (user or {}).get("borrowed_books", [])]
+
+    def search(self, qnorm, fields, fuzzy, min_ratio, similarity, top):
+        key = self.cache.make_key(self.catalog, qnorm, fields=tuple(fields), fuzzy=fuzzy, min_ratio=min_ratio,
+                                  similarity=similarity, scored=True)
+        ranked = self.cache.get(key, self.catalog)
+        if ranked is None:
+            ranked = _rank_books(qnorm, self.catalog, fields, fuzzy, min_ratio, similarity, with_scores=True)
+            self.cache.put(key, self.catalog, ranked)
+        return len(ranked), ranked[:top] if top is not None else ranked
+
+    def monthly_scan(self, now, approximate=False, top_k_capacity=100):
+        borrowed, activity, overdue = _scan_monthly_activity(self.catalog, now, approximate, top_k_capacity)
+        return borrowed, dict(activity), overdue, len(self.catalog)
+
+    def stats(self):
+        return {"branch_id": self.branch_id, "books": len(self.catalog),
+                "on_loan": sum(not b.get("available", True) for b in self.catalog)}
+
+
+def _serve(conn: Connection, shard: _Shard) -> None:
+    """Request loop: (op, args, kwargs) in, ("ok", result) or ("error", message) out."""
+    while True:
+        try:
+            op, args, kwargs = conn.recv()
+        except EOFError:
+            break
+        if op == "stop":
+            conn.send(("ok", None))
+            break
+        try:
+            conn.send(("ok", getattr(shard, op)(*args, **kwargs)))
+        except Exception as e:
+            logging.exception(f"Shard {shard.branch_id}: {op} failed")
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+    conn.close()
+
+
+def _shard_process(conn: Connection, branch_id: str, catalog, users) -> None:
+    _serve(conn, _Shard(branch_id, catalog, users))
+
+
+def _check_authkey(authkey) -> None:
+    if not isinstance(authkey, bytes) or not authkey:
+        raise ValueError("authkey must be non-empty bytes, e.g. os.urandom(32)")
+
+
+def serve_shard(address, branch_id: str, catalog: List[Dict[str, Any]], users: List[Dict[str, Any]],
+                authkey: bytes) -> None:
+    """
+    Run one shard on this host until the router disconnects.
+
+    Messages are pickles, so anyone who knows the authkey can run code in
+    this process. Generate it with os.urandom(32) and never reuse a
+    hardcoded value.
+
+    Args:
+        address (tuple): (host, port) to listen on.
+        branch_id (str): Branch owned by this shard.
+        catalog (list): The branch's books.
+        users (list): User replica.
+        authkey (bytes): Shared secret the router must present.
+    """
+    _check_authkey(authkey)
+    with Listener(address, authkey=authkey) as listener:
+        logging.info(f"Shard {branch_id} listening on {listener.address}")
+        with listener.accept() as conn:
+            _serve(conn, _Shard(branch_id, catalog, users))
+
+
+# ---------- Router ----------
+class ShardedLibrary:
+    """
+    Routing front end over one worker process per branch.
+
+    Attributes
+    ----------
+    branches : list of str
+        Branch ids, one shard each.
+    owner : dict
+        book_id -> branch_id, used to route single-book operations.
+
+    Example
+    -------
+    >>> lib = ShardedLibrary(catalog, users, tables=load_library_tables())
+    >>> lib.checkout_book("C101", 1)
+    (True, "Alice Johnson successfully checked out 'The Catcher in the Rye'. Due on 2026-11-02.")
+    >>> lib.search_books("catcher rye")["total"]
+    1
+    >>> lib.close()
+    """
+
+    def __init__(self, catalog: List[Dict[str, Any]], users: List[Dict[str, Any]], *,
+                 tables: Optional[Dict[str, Any]] = None, branches: Optional[Iterable[str]] = None,
+                 remote: Optional[Dict[str, Tuple[Any, bytes]]] = None, start_method: Optional[str] = None):
+        """
+        Args:
+            catalog (list): Full catalog; books without branch_id are assigned one
+                (see assign_branches). Each shard gets its own copy.
+            users (list): Users, replicated to every shard.
+            tables (dict): Dataset tables, used to place books by issuing branch.
+            branches (iterable): Branch ids to start (default: all branches in the catalog).
+            remote (dict): branch_id -> (address, authkey) of shards already
+                running elsewhere via serve_shard(); no local worker is started for them.
+                The authkey is the secret that shard was started with.
+            start_method (str): multiprocessing start method ("fork", "spawn", ...).
+        """
+        branches = list(branches) if branches is not None else None
+        assign_branches(catalog, tables, branches)
+        remote = remote or {}
+        self.branches = sorted(set(branches or []) | {b["branch_id"] for b in catalog} | set(remote))
+        self._conns: Dict[str, Connection] = {}
+        self._procs: Dict[str, Any] = {}
+
+        self.owner: Dict[Any, str] = {}
+
+        ctx = mp.get_context(start_method)
+        shards = defaultdict(list)
+        for book in catalog:
+            shards[book["branch_id"]].append(book)
+        try:
+            for branch in self.branches:
+                if branch in remote:
+                    address, authkey = remote[branch]
+                    _check_authkey(authkey)
+                    self._conns[branch] = Client(address, authkey=authkey)
+                    continue
+                # the process boundary (fork or pickling) already gives each shard its own copy
+                parent, child = ctx.Pipe()
+                proc = ctx.Process(target=_shard_process, name=f"shard-{branch}", daemon=True,
+                                   args=(child, branch, shards[branch], users))
+                proc.start()
+                child.close()
+                self._conns[branch] = parent
+                self._procs[branch] = proc
+
+            for branch, ids in self._scatter("book_ids").items():
+                self.owner.update((book_id, branch) for book_id in ids)
+        except BaseException:
+            self.close()
+            raise
+        logging.info(f"Started {len(self.branches)} shards ({len(self._procs)} local) for {len(self.owner)} books.")
+
+    # ---------- Transport ----------
+    def _call(self, branch: str, op: str, *args, **kwargs):
+        conn = self._conns[branch]
+        conn.send((op, args, kwargs))
+        return self._result(branch, conn.recv())
+
+    def _scatter(self, op: str, *args, **kwargs) -> Dict[str, Any]:
+        """
+        Send to every shard first, then collect, so shards work in parallel.
+
+        Every reply is read before any error is raised, so a failing shard
+        never leaves unread replies on the other connections.
+        """
+        for conn in self._conns.values():
+            conn.send((op, args, kwargs))
+        replies = {branch: conn.recv() for branch, conn in self._conns.items()}
+        errors = [f"Shard {branch}: {value}" for branch, (status, value) in replies.items() if status != "ok"]
+        if errors:
+            raise RuntimeError("; ".join(errors))
+        return {branch: value for branch, (_, value) in replies.items()}
+
+    @staticmethod
+    def _result(branch, reply):
+        status, value = reply
+        if status != "ok":
+            raise RuntimeError(f"Shard {branch}: {value}")
+        return value
+
+    # ---------- Routed operations ----------
+    def checkout_book(self, user_id, book_id, loan_period=14):
+        """checkout_book() on the shard that owns the book; (success, message)."""
+        branch = self.owner.get(book_id)
+        if branch is None:
+            return False, f"Book ID '{book_id}' not found."
+        return self._call(branch, "checkout", user_id, book_id, loan_period)
+
+    def return_book(self, user_id, book_id, daily_rate=0.25):
+        """return_book() on the shard that owns the book; (success, message, fee)."""
+        branch = self.owner.get(book_id)
+        if branch is None:
+            return False, f"Book ID '{book_id}' not found.", 0.0
+        return self._call(branch, "return_", user_id, book_id, daily_rate)
+
+    def get_book(self, book_id) -> Optional[Dict[str, Any]]:
+        """Current copy of a book from its shard, or None."""
+        branch = self.owner.get(book_id)
+        return self._call(branch, "get_book", book_id) if branch is not None else None
+
+    def add_book(self, book_data: Dict[str, Any], branch_id: str) -> bool:
+        """add_new_book() on the given branch's shard; True if the book was added."""
+        if branch_id not in self._conns:
+            raise ValueError(f"Unknown branch: {branch_id}")
+        if book_data.get("id") in self.owner:
+            print(f"Book ID '{book_data.get('id')}' already exists.")
+            return False
+        added = self._call(branch_id, "add_book", book_data)
+        if added:
+            self.owner[book_data.get("id")] = branch_id
+        return added
+
+    def add_user(self, user: Dict[str, Any]) -> None:
+        """Replicate a new user to every shard."""
+        self._scatter("add_user", user)
+
+    def user_loans(self, user_id) -> List[Dict[str, Any]]:
+        """A user's open loans across all branches (each tagged with branch_id)."""
+        return [loan for loans in self._scatter("user_loans", user_id).values() for loan in loans]
+
+    # ---------- Scatter-gather ----------
+    def search_books(self, query: str, *, fields: Tuple[str, ...] = ("title", "author", "isbn"),
+                     fuzzy: bool = True, min_ratio: float = 0.65, limit: Optional[int] = 25, page: int = 1,
+                     page_size: Optional[int] = None, similarity: str = "bitparallel") -> Dict[str, Any]:
+        """
+        search_books() over every shard, merged into one ranking.
+
+        Each shard ranks its own books and returns only the top entries the
+        requested page can need; the router merges the sorted lists by score.
+        Takes and returns the same shape as search_books(); only books with
+        the same score and title may come back in a different order.
+        """
+        if not isinstance(query, str) or not query.strip():
+            return {"total": 0, "results": [], "page": 1, "page_size": page_size}
+        if page_size is not None and page_size > 0:
+            page = max(page, 1)
+            start, top = (page - 1) * page_size, page * page_size
+        else:
+            start, top = 0, limit if limit is not None and limit > 0 else None
+
+        replies = self._scatter("search", _normalize_text(query), fields, fuzzy, min_ratio, similarity, top)
+        total = sum(n for n, _ in replies.values())
+        merged = heapq.merge(*(ranked for _, ranked in replies.values()), key=_rank_key)
+        results = [book for _, book in merged][start:top]
+        if page_size is not None and page_size > 0:
+            return {"total": total, "results": results, "page": page, "page_size": page_size}
+        return {"total": total, "results": results, "page": 1, "page_size": None}
+
+    def monthly_report(self, users: List[Dict[str, Any]], approximate: bool = False,
+                       top_k_capacity: int = 100, sink=print) -> Dict[str, Any]:
+        """
+        generate_monthly_report() across all branches.
+
+        Each shard scans its own borrow histories; title counts (Counter, or
+        SpaceSaving when approximate=True), per-user loan counts and overdue
+        titles are merged before the report is built.
+        """
+        now = datetime.now()
+        borrowed = None
+        activity: Dict[Any, int] = defaultdict(int)
+        overdue = set()
+        total_books = 0
+        for part, acts, late, n_books in self._scatter("monthly_scan", now, approximate, top_k_capacity).values():
+            borrowed = part if borrowed is None else (borrowed.merge(part) if approximate else borrowed + part)
+            for uid, loans in acts.items():
+                activity[uid] += loans
+            overdue |= late
+            total_books += n_books
+        if borrowed is None:
+            borrowed = SpaceSaving(top_k_capacity) if approximate else Counter()
+        return _build_monthly_report(now, total_books, users, borrowed, activity, overdue, approximate, sink)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-shard book and loan counts."""
+        return list(self._scatter("stats").values())
+
+    # ---------- Lifecycle ----------
+    def close(self) -> None:
+        """Stop local workers and disconnect from remote shards."""
+        for branch, conn in self._conns.items():
+            try:
+                if branch in self._procs:
+                    conn.send(("stop", (), {}))
+                    conn.recv()
+            except (EOFError, OSError):
+                pass
+            conn.close()
+        for proc in self._procs.values():
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        self._conns.clear()
+        self._procs.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return f"ShardedLibrary(branches={self.branches}, books={len(self.owner)}, local={len(self._procs)})"
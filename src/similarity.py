@@ -0,0 +1,217 @@
+"""
+similarity.py — Pluggable string-similarity backends for fuzzy search.
+
+Backends score one query against many candidates and return an array of
+ratios in [0, 1]:
+
+    "bitparallel"  (default) 2 * LCS(query, c) / (len(query) + len(c)), with the
+                   LCS length computed by Hyyrö's bit-vector algorithm over
+                   NumPy uint64 words: one pass per candidate column scores a
+                   whole batch of candidates at once.
+    "difflib"      difflib.SequenceMatcher(None, query, c).ratio() per candidate;
+                   the original pure-Python scores, kept as a compatibility mode.
+
+The two ratios share the same scale. SequenceMatcher's matched-character
+count is a greedy approximation of the LCS and never exceeds it, so
+bitparallel >= difflib for every pair: anything that clears a min_ratio
+threshold under difflib also clears it under bitparallel (it can only admit
+additional near-matches that difflib's heuristic under-scored).
+"""
+
+import difflib
+from typing import Callable, Dict, Sequence
+
+import numpy as np
+
+_WORD = 64
+_ONE = np.uint64(1)
+
+
+def difflib_ratios(query: str, candidates: Sequence[str]) -> np.ndarray:
+    """Compatibility backend: SequenceMatcher ratio for each candidate."""
+    return np.array([difflib.SequenceMatcher(None, query, c).ratio() for c in candidates], dtype=np.float64)
+
+
+def _pattern_masks(query: bytes, words: int) -> np.ndarray:
+    """PM[c, w]: bit i of word w is set where query[w * 64 + i] == c."""
+    pm = np.zeros((256, words), dtype=np.uint64)
+    for i, c in enumerate(query):
+        pm[c, i // _WORD] |= _ONE << np.uint64(i % _WORD)
+    pm[0, :] = 0  # code 0 pads shorter candidates and must never match
+    return pm
+
+
+def lcs_lengths(query: str, candidates: Sequence[str], chunk: int = 4096) -> np.ndarray:
+    """
+    Length of the longest common subsequence of ``query`` with every candidate.
+
+    Candidates are grouped by length into chunks of ``chunk`` rows and encoded
+    as a padded uint8 matrix; the bit-vector state for all rows of a chunk
+    advances together, one candidate column at a time.
+    """
+    q = query.encode("utf-8", "replace")
+    m = len(q)
+    n = len(candidates)
+    out = np.zeros(n, dtype=np.int64)
+    if m == 0 or n == 0:
+        return out
+
+    words = (m + _WORD - 1) // _WORD
+    pm = _pattern_masks(q, words)
+    tail_bits = m - (words - 1) * _WORD
+    last_mask = np.uint64((1 << tail_bits) - 1) if tail_bits < _WORD else ~np.uint64(0)
+
+    encoded = [c.encode("utf-8", "replace") for c in candidates]
+    lengths = np.fromiter((len(c) for c in encoded), dtype=np.int64, count=n)
+    order = np.argsort(lengths, kind="stable")
+
+    for start in range(0, n, chunk):
+        idx = order[start:start + chunk]
+        width = int(lengths[idx].max())
+        if width == 0:
+            continue
+        buf = np.zeros((len(idx), width), dtype=np.uint8)
+        for row, i in enumerate(idx):
+            buf[row, :lengths[i]] = np.frombuffer(encoded[i], dtype=np.uint8)
+
+        v = np.full((words, len(idx)), ~np.uint64(0), dtype=np.uint64)
+        for j in range(width):
+            eq = pm[buf[:, j]].T  # (words, rows)
+            carry = np.zeros(len(idx), dtype=np.uint64)
+            for w in range(words):
+                u = v[w] & eq[w]
+                s = v[w] + u
+                c1 = s < v[w]
+                s2 = s + carry
+                c2 = s2 < s
+                v[w] = s2 | (v[w] & ~u)
+                carry = (c1 | c2).astype(np.uint64)
+
+        # every query position still set in V is one the LCS did not use
+        v[words - 1] &= last_mask
+        unmatched = np.bitwise_count(v).sum(axis=0)
+        out[idx] = m - unmatched
+    return out
+
+
+def bitparallel_ratios(query: str, candidates: Sequence[str]) -> np.ndarray:
+    """2 * LCS / (len(query) + len(candidate)) for each candidate, batched."""
+    lcs = lcs_lengths(query, candidates)
+    total = len(query.encode("utf-8", "replace")) + np.fromiter(
+        (len(c.encode("utf-8", "replace")) for c in candidates), dtype=np.int64, count=len(candidates))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, 2.0 * lcs / np.maximum(total, 1), 1.0)
+
+
+def _pad(encoded: Sequence[bytes], lengths: np.ndarray, width: int) -> np.ndarray:
+    """Left-aligned, zero-padded uint8 matrix of byte strings."""
+    buf = np.zeros((len(encoded), width), dtype=np.uint8)
+    buf[np.arange(width) < lengths[:, None]] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return buf
+
+
+def paired_lcs_lengths(left: Sequence[str], right: Sequence[str], chunk: int = 4096) -> np.ndarray:
+    """
+    LCS length of ``left[i]`` with ``right[i]`` for every i.
+
+    Same bit-vector recurrence as lcs_lengths(), but each row carries its own
+    pattern masks, so a batch of unrelated pairs (e.g. dedup candidates)
+    advances together instead of needing one call per query string.
+    """
+    if len(left) != len(right):
+        raise ValueError("left and right must have the same length")
+    n = len(left)
+    out = np.zeros(n, dtype=np.int64)
+    if n == 0:
+        return out
+
+    enc_l = [s.encode("utf-8", "replace") for s in left]
+    enc_r = [s.encode("utf-8", "replace") for s in right]
+    len_l = np.fromiter((len(s) for s in enc_l), dtype=np.int64, count=n)
+    len_r = np.fromiter((len(s) for s in enc_r), dtype=np.int64, count=n)
+    order = np.lexsort((len_l, len_r))
+    all_bits = ~np.uint64(0)
+
+    for start in range(0, n, chunk):
+        idx = order[start:start + chunk]
+        rows = np.arange(len(idx))
+        m = len_l[idx]
+        qwidth, width = int(m.max()), int(len_r[idx].max())
+        if qwidth == 0 or width == 0:
+            continue
+        words = (qwidth + _WORD - 1) // _WORD
+
+        qbuf = _pad([enc_l[i] for i in idx], m, qwidth)
+        buf = _pad([enc_r[i] for i in idx], len_r[idx], width)
+
+        pm = np.zeros((len(idx), 256, words), dtype=np.uint64)
+        for i in range(qwidth):
+            pm[rows, qbuf[:, i], i // _WORD] |= _ONE << np.uint64(i % _WORD)
+        pm[:, 0, :] = 0
+
+        v = np.full((words, len(idx)), all_bits, dtype=np.uint64)
+        for j in range(width):
+            eq = pm[rows, buf[:, j]].T  # (words, rows)
+            carry = np.zeros(len(idx), dtype=np.uint64)
+            for w in range(words):
+                u = v[w] & eq[w]
+                s = v[w] + u
+                c1 = s < v[w]
+                s2 = s + carry
+                c2 = s2 < s
+                v[w] = s2 | (v[w] & ~u)
+                carry = (c1 | c2).astype(np.uint64)
+
+        # per-row mask of the bits that correspond to real query positions
+        bits = np.clip(m[None, :] - (np.arange(words) * _WORD)[:, None], 0, _WORD)
+        masks = np.where(bits >= _WORD, all_bits,
+                         (_ONE << np.minimum(bits, _WORD - 1).astype(np.uint64)) - _ONE)
+        out[idx] = m - np.bitwise_count(v & masks).sum(axis=0)
+    return out
+
+
+def paired_ratios(left: Sequence[str], right: Sequence[str], backend: str = "bitparallel") -> np.ndarray:
+    """
+    Similarity ratio of each (left[i], right[i]) pair.
+
+    Args:
+        left, right (sequence): Normalized strings of equal length.
+        backend (str): "bitparallel" (batched LCS ratio) or "difflib".
+
+    Returns:
+        ndarray: float64 ratios in [0, 1].
+    """
+    if backend == "difflib":
+        return np.array([difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(left, right)],
+                        dtype=np.float64)
+    if backend != "bitparallel":
+        raise ValueError(f"Unknown similarity backend: {backend!r} (choose from {sorted(BACKENDS)})")
+    lcs = paired_lcs_lengths(left, right)
+    total = np.fromiter((len(a.encode("utf-8", "replace")) + len(b.encode("utf-8", "replace"))
+                         for a, b in zip(left, right)), dtype=np.int64, count=len(left))
+    return np.where(total > 0, 2.0 * lcs / np.maximum(total, 1), 1.0)
+
+
+BACKENDS: Dict[str, Callable[[str, Sequence[str]], np.ndarray]] = {
+    "difflib": difflib_ratios,
+    "bitparallel": bitparallel_ratios,
+}
+
+
+def similarity_scores(query: str, candidates: Sequence[str], backend: str = "bitparallel") -> np.ndarray:
+    """
+    Score ``query`` against every candidate with the chosen backend.
+
+    Args:
+        query (str): Normalized query text.
+        candidates (sequence): Normalized candidate strings.
+        backend (str): "bitparallel" or "difflib" (compatibility).
+
+    Returns:
+        ndarray: float64 ratios in [0, 1], aligned with ``candidates``.
+    """
+    try:
+        scorer = BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown similarity backend: {backend!r} (choose from {sorted(BACKENDS)})")
+    return scorer(query, candidates)
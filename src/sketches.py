@@ -0,0 +1,276 @@
+"""
+sketches.py — Bounded-memory streaming sketches for approximate report metrics.
+
+All three sketches hash values with pandas' stable 64-bit hash, so sketches
+built in different processes or over different partitions of the loan history
+can be merged, and they round-trip through plain dicts (JSON-safe) for storage.
+
+    HyperLogLog   distinct counts        std. error ~ 1.04 / sqrt(2 ** precision)
+    CountMinSketch frequency estimates   never under-counts; over-counts by at most
+                                         epsilon * N with probability 1 - delta
+    SpaceSaving   heavy hitters (top-k)  any item with frequency > N / capacity is
+                                         kept; each count over-estimates by at most
+                                         its recorded error (<= N / capacity)
+"""
+
+import base64
+import heapq
+import math
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _hash64(values: Iterable[Any]) -> np.ndarray:
+    """Stable (process-independent) 64-bit hashes of the string form of ``values``."""
+    if not isinstance(values, pd.Series):
+        values = pd.Series(list(values), dtype=object)
+    return pd.util.hash_array(values.astype(str).to_numpy(dtype=object), categorize=False)
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Vectorized int.bit_length() for a uint64 array."""
+    x = x.copy()
+    n = np.zeros(x.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = x >= (np.uint64(1) << np.uint64(shift))
+        n[big] += shift
+        x[big] >>= np.uint64(shift)
+    return n + (x > 0)
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-count sketch.
+
+    Memory is ``2 ** precision`` bytes regardless of stream length. With the
+    default precision of 12 (4 KiB) the relative standard error is about 1.6%.
+
+    Example
+    -------
+    >>> hll = HyperLogLog()
+    >>> hll.update(["C101", "C102", "C101"])
+    >>> round(hll.count())
+    2
+    """
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        """Standard error of count() relative to the true cardinality."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, value: Any) -> None:
+        self.update([value])
+
+    def update(self, values: Iterable[Any]) -> None:
+        """Add a batch of values (vectorized)."""
+        h = _hash64(values)
+        if not len(h):
+            return
+        p = np.uint64(self.precision)
+        idx = (h >> (np.uint64(64) - p)).astype(np.int64)
+        rest = h & ((np.uint64(1) << (np.uint64(64) - p)) - np.uint64(1))
+        rank = (64 - self.precision) - _bit_length(rest) + 1
+        np.maximum.at(self.registers, idx, rank.astype(np.uint8))
+
+    def count(self) -> float:
+        """Estimated number of distinct values seen."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)  # linear counting for small cardinalities
+        return float(estimate)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Fold ``other`` into this sketch (union of the two streams)."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": "hll", "precision": self.precision,
+                "registers": base64.b64encode(self.registers.tobytes()).decode("ascii")}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "HyperLogLog":
+        hll = cls(d["precision"])
+        hll.registers = np.frombuffer(base64.b64decode(d["registers"]), dtype=np.uint8).copy()
+        return hll
+
+
+class CountMinSketch:
+    """
+    Count-Min frequency sketch.
+
+    ``width = ceil(e / epsilon)`` and ``depth = ceil(ln(1 / delta))``; an
+    estimate never under-counts and exceeds the true count by more than
+    ``epsilon * total`` with probability at most ``delta``.
+    """
+
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01):
+        self.epsilon = epsilon
+        self.delta = delta
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        self.total = 0
+
+    def _columns(self, values: Iterable[Any]) -> np.ndarray:
+        h = _hash64(values)
+        h1, h2 = h & np.uint64(0xFFFFFFFF), (h >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1[None, :] + rows * h2[None, :]) % np.uint64(self.width)).astype(np.int64)
+
+    def add(self, value: Any, count: int = 1) -> None:
+        self.update([value], count)
+
+    def update(self, values: Iterable[Any], count: int = 1) -> None:
+        """Add every value in ``values`` ``count`` times (vectorized)."""
+        cols = self._columns(values)
+        for r in range(self.depth):
+            np.add.at(self.table[r], cols[r], count)
+        self.total += cols.shape[1] * count
+
+    def estimate(self, value: Any) -> int:
+        """Upper-bound estimate of how often ``value`` was added."""
+        cols = self._columns([value])[:, 0]
+        return int(self.table[np.arange(self.depth), cols].min())
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        if self.table.shape != other.table.shape:
+            raise ValueError("Cannot merge Count-Min sketches with different dimensions")
+        self.table += other.table
+        self.total += other.total
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": "cms", "epsilon": self.epsilon, "delta": self.delta, "total": self.total,
+                "table": base64.b64encode(self.table.tobytes()).decode("ascii")}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "CountMinSketch":
+        cms = cls(d["epsilon"], d["delta"])
+        cms.table = np.frombuffer(base64.b64decode(d["table"]), dtype=np.int64).reshape(cms.depth, cms.width).copy()
+        cms.total = d["total"]
+        return cms
+
+
+class SpaceSaving:
+    """
+    Space-saving heavy-hitter summary (Metwally et al.).
+
+    Keeps at most ``capacity`` counters. Every item whose true frequency
+    exceeds ``total / capacity`` is guaranteed to be present, and each reported
+    count over-estimates the true one by at most the item's ``error``.
+
+    Counters are grouped into buckets by count (the stream-summary layout),
+    with a lazily pruned heap of bucket counts, so finding the eviction victim
+    never scans the counters: add() is O(1) for tracked items and O(log k)
+    at worst for an eviction.
+    """
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.counters: Dict[Any, List[int]] = {}  # item -> [count, error]
+        self.total = 0
+        self._buckets: Dict[int, Dict[Any, None]] = {}  # count -> items, oldest first
+        self._heap: List[int] = []                      # bucket counts (may hold stale ones)
+
+    def _bucket_add(self, item: Any, count: int) -> None:
+        bucket = self._buckets.get(count)
+        if bucket is None:
+            bucket = self._buckets[count] = {}
+            heapq.heappush(self._heap, count)
+            if len(self._heap) > 4 * len(self._buckets) + 64:
+                self._heap = list(self._buckets)
+                heapq.heapify(self._heap)
+        bucket[item] = None
+
+    def _rebuild(self) -> None:
+        self._buckets, self._heap = {}, []
+        for item, (count, _) in self.counters.items():
+            self._bucket_add(item, count)
+
+    def add(self, item: Any, count: int = 1) -> None:
+        self.total += count
+        buckets = self._buckets
+        entry = self.counters.get(item)
+        if entry is not None:
+            bucket = buckets[entry[0]]
+            del bucket[item]
+            if not bucket:
+                del buckets[entry[0]]
+            entry[0] += count
+        elif len(self.counters) < self.capacity:
+            entry = self.counters[item] = [count, 0]
+        else:
+            heap = self._heap
+            while heap[0] not in buckets:
+                heapq.heappop(heap)
+            floor = heap[0]
+            bucket = buckets[floor]
+            victim = next(iter(bucket))
+            del bucket[victim]
+            if not bucket:
+                del buckets[floor]
+            del self.counters[victim]
+            entry = self.counters[item] = [floor + count, floor]
+        bucket = buckets.get(entry[0])
+        if bucket is None:
+            self._bucket_add(item, entry[0])
+        else:
+            bucket[item] = None
+
+    def update(self, items: Iterable[Any]) -> None:
+        if hasattr(items, "tolist"):  # Series / ndarray: iterate Python objects, not boxed scalars
+            items = items.tolist()
+        for item in items:
+            self.add(item)
+
+    def most_common(self, k: int = None) -> List[Tuple[Any, int]]:
+        """Top items as (item, estimated_count), like Counter.most_common."""
+        ranked = sorted(self.counters.items(), key=lambda kv: -kv[1][0])
+        return [(item, c) for item, (c, _) in ranked[:k]]
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """Combine two summaries; items missing from one side get that side's minimum count."""
+        floor_self = min((c for c, _ in self.counters.values()), default=0) if len(self.counters) >= self.capacity else 0
+        floor_other = min((c for c, _ in other.counters.values()), default=0) if len(other.counters) >= other.capacity else 0
+        merged = {}
+        for item in set(self.counters) | set(other.counters):
+            c1, e1 = self.counters.get(item, (floor_self, floor_self))
+            c2, e2 = other.counters.get(item, (floor_other, floor_other))
+            merged[item] = [c1 + c2, e1 + e2]
+        keep = sorted(merged, key=lambda k: -merged[k][0])[:self.capacity]
+        self.counters = {k: merged[k] for k in keep}
+        self.total += other.total
+        self._rebuild()
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": "spacesaving", "capacity": self.capacity, "total": self.total,
+                "counters": [[item, c, e] for item, (c, e) in self.counters.items()]}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "SpaceSaving":
+        ss = cls(d["capacity"])
+        ss.counters = {item: [c, e] for item, c, e in d["counters"]}
+        ss.total = d["total"]
+        ss._rebuild()
+        return ss
+
+
+def sketch_from_dict(d: Dict[str, Any]):
+    """Rebuild any sketch produced by ``to_dict()``."""
+    kinds = {"hll": HyperLogLog, "cms": CountMinSketch, "spacesaving": SpaceSaving}
+    return kinds[d["type"]].from_dict(d)
@@ -0,0 +1,218 @@
+"""
+typeahead.py — Search-as-you-type prefix index over titles and authors.
+
+Keys are the normalized tokens produced by _normalize_text/_tokenize plus the
+full normalized title and author (so "harry pot" completes as a phrase). Short
+prefixes, which match the most keys, are answered from a character trie whose
+nodes cache their popularity-weighted top-k books; longer prefixes fall back to
+a bisect over a sorted array of keys, where the matching range is already small.
+Both structures are updated incrementally when books are added or removed.
+"""
+
+import bisect
+import heapq
+import itertools
+from typing import Any, Dict, List, Optional, Tuple
+
+from .main_function_library_ import _normalize_text, _tokenize
+from .search_cache import watch_catalog, unwatch_catalog
+
+
+class _Node:
+    __slots__ = ("children", "top", "terminals")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.top: List[Tuple[float, str, int]] = []   # (-weight, title, ref), best first
+        self.terminals: Dict[int, None] = {}           # refs whose key path ends at this node
+
+
+class TypeaheadIndex:
+    """
+    Popularity-ranked prefix completion for book titles and authors.
+
+    Args:
+        k (int): Completions cached per trie node (upper bound for complete()).
+        trie_depth (int): Prefixes up to this length use the trie; longer ones
+            use the sorted-array index.
+        popularity (dict): Optional book id/isbn -> weight. Defaults to the
+            length of each book's borrow_history.
+
+    Example
+    -------
+    >>> idx = TypeaheadIndex.from_catalog(books)     # follows add_new_book/remove_book
+    >>> [b["title"] for b in idx.complete("har", 3)]
+    ['Harry Potter and the Sorcerers Stone']
+    """
+
+    def __init__(self, k: int = 10, trie_depth: int = 6, popularity: Optional[Dict[Any, float]] = None):
+        self.k = k
+        self.trie_depth = trie_depth
+        self.popularity = popularity or {}
+        self._root = _Node()
+        self._sorted: List[Tuple[str, int]] = []     # (key, ref), sorted
+        self._books: Dict[int, Dict[str, Any]] = {}
+        self._refs: Dict[int, int] = {}               # id(book) -> ref
+        self._weights: Dict[int, float] = {}
+        self._titles: Dict[int, str] = {}
+        self._seq = itertools.count()
+        self._catalog = None
+
+    @classmethod
+    def from_catalog(cls, catalog: List[Dict[str, Any]], attach: bool = True, **kwargs) -> "TypeaheadIndex":
+        """Index every active book in ``catalog`` and (by default) follow its changes."""
+        index = cls(**kwargs)
+        index.rebuild(catalog)
+        if attach:
+            index.attach(catalog)
+        return index
+
+    def attach(self, catalog: List[Dict[str, Any]]) -> None:
+        """Keep the index current under add_new_book / remove_book / imports."""
+        self.detach()
+        self._catalog = catalog
+        watch_catalog(catalog, self._on_change)
+
+    def detach(self) -> None:
+        if self._catalog is not None:
+            unwatch_catalog(self._catalog, self._on_change)
+            self._catalog = None
+
+    def _on_change(self, event: Optional[str], book: Optional[Dict[str, Any]]) -> None:
+        if event == "add" and book is not None:
+            self.add(book)
+        elif event == "remove" and book is not None:
+            self.remove(book)
+        else:
+            self.rebuild(self._catalog)
+
+    def rebuild(self, catalog: List[Dict[str, Any]]) -> None:
+        """Re-index ``catalog`` from scratch (one sort instead of per-key inserts)."""
+        self._root, self._sorted = _Node(), []
+        for table in (self._books, self._refs, self._weights, self._titles):
+            table.clear()
+        for book in catalog:
+            if not book.get("removed"):
+                self.add(book, _bulk=True)
+        self._sorted.sort()
+
+    # ---------- Keys and weights ----------
+    @staticmethod
+    def _keys(book: Dict[str, Any]) -> List[str]:
+        keys = set()
+        for field in ("title", "author"):
+            tokens = _tokenize(book.get(field, ""))
+            keys.update(tokens)
+            if len(tokens) > 1:
+                keys.add(" ".join(tokens))
+        return sorted(keys)
+
+    def _weight(self, book: Dict[str, Any]) -> float:
+        for ident in (book.get("id"), book.get("isbn")):
+            if ident is not None and ident in self.popularity:
+                return self.popularity[ident]
+        return len(book.get("borrow_history", []))
+
+    def _path(self, key: str, create: bool = False) -> List[_Node]:
+        """Trie nodes for key[:1] .. key[:trie_depth] (stops early if missing)."""
+        node, path = self._root, []
+        for ch in key[: self.trie_depth]:
+            nxt = node.children.get(ch)
+            if nxt is None:
+                if not create:
+                    break
+                nxt = node.children[ch] = _Node()
+            node = nxt
+            path.append(node)
+        return path
+
+    # ---------- Updates ----------
+    def add(self, book: Dict[str, Any], _bulk: bool = False) -> None:
+        """Index (or re-index) a book."""
+        if id(book) in self._refs:
+            self.remove(book)
+        ref = next(self._seq)
+        self._refs[id(book)] = ref
+        self._books[ref] = book
+        self._weights[ref] = self._weight(book)
+        self._titles[ref] = _normalize_text(book.get("title", ""))
+        entry = (-self._weights[ref], self._titles[ref], ref)
+        for key in self._keys(book):
+            if _bulk:
+                self._sorted.append((key, ref))
+            else:
+                bisect.insort(self._sorted, (key, ref))
+            path = self._path(key, create=True)
+            path[-1].terminals[ref] = None  # deepest node covers keys longer than trie_depth too
+            for node in path:
+                self._offer(node, entry)
+
+    def _offer(self, node: _Node, entry: Tuple[float, str, int]) -> None:
+        top = node.top
+        if any(e[2] == entry[2] for e in top):
+            return
+        if len(top) < self.k or entry < top[-1]:
+            bisect.insort(top, entry)
+            del top[self.k:]
+
+    def remove(self, book: Dict[str, Any]) -> None:
+        """Drop a book from the index."""
+        ref = self._refs.pop(id(book), None)
+        if ref is None:
+            return
+        touched = {}
+        for key in self._keys(book):
+            i = bisect.bisect_left(self._sorted, (key, ref))
+            if i < len(self._sorted) and self._sorted[i] == (key, ref):
+                del self._sorted[i]
+            path = self._path(key)
+            if path:
+                path[-1].terminals.pop(ref, None)
+            for depth, node in enumerate(path):
+                touched[id(node)] = (depth, node)
+        del self._books[ref], self._weights[ref], self._titles[ref]
+        # deepest first, so parents merge already-recomputed children
+        for _, node in sorted(touched.values(), key=lambda t: -t[0]):
+            if any(e[2] == ref for e in node.top):
+                self._recompute(node)
+
+    def _recompute(self, node: _Node) -> None:
+        candidates = {e[2]: e for child in node.children.values() for e in child.top}
+        for ref in node.terminals:
+            candidates[ref] = (-self._weights[ref], self._titles[ref], ref)
+        node.top = heapq.nsmallest(self.k, candidates.values())
+
+    def record_borrow(self, book: Dict[str, Any], count: float = 1) -> None:
+        """Raise a book's popularity after a checkout."""
+        ref = self._refs.get(id(book))
+        if ref is None:
+            return
+        self.popularity[book.get("id", book.get("isbn"))] = self._weights[ref] + count
+        self.add(book)
+
+    # ---------- Queries ----------
+    def complete(self, prefix: str, k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Most popular books with a title/author key starting with ``prefix``."""
+        k = self.k if k is None else k
+        p = " ".join(_tokenize(prefix))
+        if prefix[-1:].isspace() and p:
+            p += " "
+        if not p:
+            return []
+        if len(p) <= self.trie_depth:
+            path = self._path(p)
+            if len(path) < len(p):
+                return []
+            if k <= self.k:
+                return [self._books[ref] for _, _, ref in path[-1].top[:k]]
+        lo = bisect.bisect_left(self._sorted, (p, -1))
+        hi = bisect.bisect_left(self._sorted, (p + "\uffff", -1))
+        refs = {ref for _, ref in self._sorted[lo:hi]}
+        best = heapq.nsmallest(k, ((-self._weights[r], self._titles[r], r) for r in refs))
+        return [self._books[ref] for _, _, ref in best]
+
+    def __len__(self):
+        return len(self._books)
+
+    def __repr__(self):
+        return f"TypeaheadIndex(books={len(self._books)}, keys={len(self._sorted)})"
@@ -12,3 +12,10 @@ for file in os.listdir(data_path):
         print(f"\n--- {file} ---")
         df = pd.read_csv(os.path.join(data_path, file))
         print(df.head())  # Show the first 5 rows
+
+# Check keys, foreign keys, date ordering and value domains across all tables
+from src.library_name import load_library_tables
+from src.dataset_validation import validate_dataset, validation_summary
+
+print("\n--- integrity checks ---")
+print(validation_summary(validate_dataset(load_library_tables(data_path))))